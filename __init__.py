@@ -1,11 +1,54 @@
 """
 Set up unit registry (see https://pint.readthedocs.io/en/stable/).
 Define display units (U.S. / S.I.).
+
+The registry caches its parsed definition files on disk (set the
+PUMP_ANALYSIS_UNIT_CACHE environment variable to choose the folder, or to an
+empty string to disable the cache), and unit() memoizes unit lookups so hot
+paths never re-parse unit strings.
+
+Quantities are checked and converted to canonical SI base units once, when
+they enter the package (DesignPoint, Fluid, Material and part constructors).
+Internals run on the resulting plain floats/ndarrays, and display units are
+only applied when results are printed or plotted.
 """
 
-from pint import UnitRegistry
+import functools
+import os
+
+import numpy as np
+
+from pint import UnitRegistry, set_application_registry
+
+def build_registry(cache_folder=":auto:"):
+    """
+    Builds the unit registry. With a cache folder, pint stores the parsed
+    definitions there and later interpreter starts load them instead of
+    parsing the definition files again.
+    """
+    if cache_folder:
+        try:
+            return UnitRegistry(cache_folder=cache_folder)
+        except OSError:
+            pass
+    return UnitRegistry()
 
-ureg = UnitRegistry()
+ureg = build_registry(os.environ.get("PUMP_ANALYSIS_UNIT_CACHE", ":auto:"))
+
+def init_worker():
+    """
+    Process pool initializer: makes ureg pint's application registry in the
+    worker, so the quantities of pickled tasks are restored into it. The
+    calling process keeps its own application registry.
+    """
+    set_application_registry(ureg)
+
+@functools.lru_cache(maxsize=None)
+def unit(name):
+    """
+    Memoized ureg.parse_units: returns the (shared) Unit for a unit string.
+    """
+    return ureg.parse_units(name)
 
 display_units = {}
 
@@ -13,37 +56,213 @@ def set_display_units(unit_system):
     """
     """
     if unit_system == "freedom":
-        display_units["length"]      = ureg("inch")
-        display_units["head"]        = ureg("feet")
-        display_units["pressure"]    = ureg("psi")
-        display_units["temperature"] = ureg("degF")
-        display_units["velocity"]    = ureg.parse_units("ft/s")
-        display_units["mass_flow"]   = ureg.parse_units("lb/s")
-        display_units["volume_flow"] = ureg.parse_units("gal/min")
+        display_units["length"]      = unit("inch")
+        display_units["head"]        = unit("feet")
+        display_units["pressure"]    = unit("psi")
+        display_units["temperature"] = unit("degF")
+        display_units["velocity"]    = unit("ft/s")
+        display_units["mass_flow"]   = unit("lb/s")
+        display_units["volume_flow"] = unit("gal/min")
     elif unit_system == "metric":
-        display_units["length"]      = ureg("mm")
-        display_units["head"]        = 1 * ureg("m")
-        display_units["pressure"]    = ureg("bar")
-        display_units["temperature"] = ureg("kelvin")
-        display_units["velocity"]    = ureg.parse_units("m/s")
-        display_units["mass_flow"]   = ureg.parse_units("kg/s")
-        display_units["volume_flow"] = ureg.parse_units("litre/s")
+        display_units["length"]      = unit("mm")
+        display_units["head"]        = unit("m")
+        display_units["pressure"]    = unit("bar")
+        display_units["temperature"] = unit("kelvin")
+        display_units["velocity"]    = unit("m/s")
+        display_units["mass_flow"]   = unit("kg/s")
+        display_units["volume_flow"] = unit("litre/s")
     return None
 
 set_display_units("metric")
 
-class DesignPoint:
-    def __init__(self, fluid, pressure_rise, mass_flowrate, rotational_speed):
+base_units = {
+    "dimensionless":    unit("dimensionless"),
+    "length":           unit("m"),
+    "mass":             unit("kg"),
+    "angle":            unit("rad"),
+    "pressure":         unit("Pa"),
+    "density":          unit("kg/m**3"),
+    "viscosity":        unit("Pa*s"),
+    "velocity":         unit("m/s"),
+    "acceleration":     unit("m/s**2"),
+    "angular_velocity": unit("rad/s"),
+    "mass_flow":        unit("kg/s"),
+    "volume_flow":      unit("m**3/s"),
+    "force":            unit("N"),
+    "inertia":          unit("kg*m**2"),
+}
+
+def strip_units(value, kind):
+    """
+    Checks that value has the dimensionality of base_units[kind] and returns
+    its magnitude in SI base units (float or ndarray). Plain numbers and
+    arrays are assumed to already be expressed in SI base units.
+    """
+    if isinstance(value, ureg.Quantity):
+        return value.m_as(base_units[kind])
+    return value
+
+def with_units(magnitude, kind, display=None):
+    """
+    Wraps an SI magnitude into a quantity, expressed in display_units[display]
+    if display is given.
+    """
+    quantity = ureg.Quantity(magnitude, base_units[kind])
+    if display is not None:
+        quantity = quantity.to(display_units[display])
+    return quantity
+
+class SIQuantity:
+    """
+    Read-only attribute exposing obj.si[name] as a quantity in display units.
+    """
+    def __init__(self, kind, display=None):
+        self.kind    = kind
+        self.display = display
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return with_units(obj.si[self.name], self.kind, self.display)
+
+# standard gravity (m/s**2)
+g_n = ureg.Quantity(1, unit("g_n")).m_as(base_units["acceleration"])
+
+class DesignPointSI(dict):
+    """
+    Read-only SI values of a DesignPoint. Derived values (keys in
+    DesignPointSI.derived) are computed from the inputs and the fluid on
+    first access, then stored.
+    """
+    derived = ("h", "q", "ns", "npsha", "nss")
+
+    def __init__(self, values, fluid):
+        super().__init__(values)
         self.fluid = fluid
-        self.dp    = pressure_rise
-        self.mdot  = mass_flowrate
-        self.omega = rotational_speed
 
-from . import plotting
+    def __missing__(self, key):
+        if key not in self.derived:
+            raise KeyError(key)
+        rho = self.fluid.si["rho"]
+        if key == "h":
+            value = self["dp"] / (rho * g_n)
+        elif key == "q":
+            value = self["mdot"] / rho
+        elif key == "ns":
+            value = self["omega"] * self["q"]**0.5 / (g_n * self["h"])**0.75
+        elif key == "npsha":
+            if "p_in" not in self:
+                raise ValueError("NPSHa requires the design point inlet " + \
+                                 "pressure.")
+            value = (self["p_in"] - self.fluid.si["pv"]) / (rho * g_n)
+        elif key == "nss":
+            value = self["omega"] * self["q"]**0.5 / \
+                    (g_n * self["npsha"])**0.75
+        dict.__setitem__(self, key, value)
+        return value
+
+    def __setitem__(self, key, value):
+        raise TypeError("DesignPoint values are read-only.")
+
+    def __delitem__(self, key):
+        raise TypeError("DesignPoint values are read-only.")
+
+    def __reduce__(self):
+        return (DesignPointSI, (dict(self), self.fluid))
+
+class DesignPoint:
+    """
+    Immutable pump design point. Head, volume flow, specific speed and, with
+    an inlet pressure, NPSHa and suction specific speed are derived lazily
+    (see DesignPointSI) and shared by every part sized for this design point.
+    Specific speeds are dimensionless (omega Q**0.5 / (g H)**0.75).
+
+    Use replace() to get a design point with some inputs changed.
+    """
+    h     = SIQuantity("length", "head")
+    q     = SIQuantity("volume_flow", "volume_flow")
+    ns    = SIQuantity("dimensionless")
+    npsha = SIQuantity("length", "head")
+    nss   = SIQuantity("dimensionless")
+
+    inputs = ("dp", "mdot", "omega", "p_in")
+
+    def __init__(self, fluid, pressure_rise, mass_flowrate, rotational_speed,
+                 inlet_pressure=None):
+        values = {"dp":    strip_units(pressure_rise, "pressure"),
+                  "mdot":  strip_units(mass_flowrate, "mass_flow"),
+                  "omega": strip_units(rotational_speed, "angular_velocity")}
+        if inlet_pressure is not None:
+            values["p_in"] = strip_units(inlet_pressure, "pressure")
+
+        set_attribute = super().__setattr__
+        set_attribute("fluid", fluid)
+        set_attribute("dp",    pressure_rise)
+        set_attribute("mdot",  mass_flowrate)
+        set_attribute("omega", rotational_speed)
+        set_attribute("p_in",  inlet_pressure)
+        set_attribute("si",    DesignPointSI(values, fluid))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DesignPoint is immutable, use replace().")
+
+    def __delattr__(self, name):
+        raise AttributeError("DesignPoint is immutable, use replace().")
+
+    def replace(self, **changes):
+        """
+        New design point with the given constructor arguments changed.
+        """
+        arguments = {"fluid":            self.fluid,
+                     "pressure_rise":    self.dp,
+                     "mass_flowrate":    self.mdot,
+                     "rotational_speed": self.omega,
+                     "inlet_pressure":   self.p_in}
+        arguments.update(changes)
+        return DesignPoint(**arguments)
+
+    def cache_key(self):
+        """
+        Values identifying the design point in the persistent cache.
+        """
+        return ({key: self.si[key] for key in self.inputs if key in self.si},
+                self.fluid)
+
+    def __eq__(self, other):
+        if not isinstance(other, DesignPoint):
+            return NotImplemented
+        values, other_values = self.cache_key()[0], other.cache_key()[0]
+        return self.fluid is other.fluid and \
+               values.keys() == other_values.keys() and \
+               all(np.array_equal(values[key], other_values[key])
+                   for key in values)
+
+    def __hash__(self):
+        # values may be arrays (batch design points): hash their bytes,
+        # with -0.0 folded into 0.0 as np.array_equal does
+        values = self.cache_key()[0]
+        return hash((id(self.fluid),
+                     tuple((key, np.shape(values[key]),
+                            (np.asarray(values[key], dtype=float)
+                             + 0.0).tobytes())
+                           for key in sorted(values))))
+
 from . import parts
 from . import fluids
 from . import materials
-from . import analyses
-from . import rotor
 
-from . import examples
+# plotting (matplotlib), analyses/rotor (ROSS) and examples (which build full
+# rotors) are slow to import and are loaded on first attribute access
+lazy_submodules = ("plotting", "analyses", "rotor", "examples")
+
+def __getattr__(name):
+    if name in lazy_submodules:
+        import importlib
+        return importlib.import_module("." + name, __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(lazy_submodules))
@@ -0,0 +1,334 @@
+"""
+Lean Timoshenko beam finite element rotor model for fast screening, without
+ROSS: sparse mass, stiffness and gyroscopic matrices are assembled straight
+from a rotor_model_data() description, and whirl roots come from a sparse
+shift-invert eigensolver. The ROSS models of analyses.rotordynamics remain
+the high-fidelity reference.
+
+Lateral motion only, four DOFs per node: x, y, alpha and beta (rotations
+about x and y, alpha = -dy/dz and beta = dx/dz, as in ROSS), all in SI
+base units.
+"""
+
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from scipy.optimize import linear_sum_assignment
+
+from .. import strip_units
+from .mesh import discretize_rotor, rotor_model_data
+
+number_dof = 4
+
+# element DOFs of the x-z plane (x1, beta1, x2, beta2) and of the y-z plane
+# (y1, alpha1, y2, alpha2), in the element DOF order (x1, y1, alpha1, beta1,
+# x2, y2, alpha2, beta2)
+plane_x = np.array([0, 3, 4, 7])
+plane_y = np.array([1, 2, 5, 6])
+# (y, dy/dz) of the y-z plane from (y, alpha): the rotations change sign
+flip = np.array([1.0, -1.0, 1.0, -1.0])
+
+def shear_coefficient(nu):
+    """
+    Shear coefficient of a solid circular section (Cowper).
+    """
+    return 6 * (1 + nu) / (7 + 6*nu)
+
+def element_matrices(length, diameter, rho, e, nu):
+    """
+    Mass, stiffness and gyroscopic matrices of solid cylindrical Timoshenko
+    beam elements (shear deformation and rotary inertia included), one
+    (8, 8) matrix per element: arrays of shape (n_elements, 8, 8).
+    Complex lengths and diameters are carried through, for complex-step
+    derivatives.
+    """
+    L = np.asarray(length)[:, None, None]
+    d = np.asarray(diameter)[:, None, None]
+    A = np.pi/4 * d**2
+    I = np.pi/64 * d**4
+    G = e / (2 * (1 + nu))
+    phi = 12 * e * I / (shear_coefficient(nu) * G * A * L**2)
+    one = np.ones_like(phi)
+
+    # planar matrices in (w1, dw1/dz, w2, dw2/dz)
+    m11 = 13/35 + 7*phi/10 + phi**2/3
+    m12 = (11/210 + 11*phi/120 + phi**2/24) * L
+    m13 = 9/70 + 3*phi/10 + phi**2/6
+    m14 = -(13/420 + 3*phi/40 + phi**2/24) * L
+    m22 = (1/105 + phi/60 + phi**2/120) * L**2
+    m24 = -(1/140 + phi/60 + phi**2/120) * L**2
+    translation = rho * A * L / (1 + phi)**2 * np.block([
+            [m11,  m12,  m13,  m14],
+            [m12,  m22, -m14,  m24],
+            [m13, -m14,  m11, -m12],
+            [m14,  m24, -m12,  m22]])
+
+    r12 = (1/10 - phi/2) * L
+    r22 = (2/15 + phi/6 + phi**2/3) * L**2
+    r24 = (-1/30 - phi/6 + phi**2/6) * L**2
+    rotation = rho * I / ((1 + phi)**2 * L) * np.block([
+            [ 6/5*one,  r12, -6/5*one,  r12],
+            [ r12,      r22, -r12,      r24],
+            [-6/5*one, -r12,  6/5*one, -r12],
+            [ r12,      r24, -r12,      r22]])
+
+    bending = e * I / ((1 + phi) * L**3) * np.block([
+            [ 12*one,  6*L,            -12*one,  6*L],
+            [ 6*L,     (4 + phi)*L**2, -6*L,     (2 - phi)*L**2],
+            [-12*one, -6*L,             12*one, -6*L],
+            [ 6*L,     (2 - phi)*L**2, -6*L,     (4 + phi)*L**2]])
+
+    n = len(L)
+    M = np.zeros((n, 8, 8), dtype=phi.dtype)
+    K = np.zeros((n, 8, 8), dtype=phi.dtype)
+    G = np.zeros((n, 8, 8), dtype=phi.dtype)
+    x, y = np.ix_(plane_x, plane_x), np.ix_(plane_y, plane_y)
+    signs = np.outer(flip, flip)
+    M[:, x[0], x[1]] = translation + rotation
+    M[:, y[0], y[1]] = signs * (translation + rotation)
+    K[:, x[0], x[1]] = bending
+    K[:, y[0], y[1]] = signs * bending
+    # the polar inertia of a shaft slice is twice its diametral inertia
+    G[:, plane_y[:, None], plane_x] = -flip[:, None] * 2 * rotation
+    G[:, plane_x[:, None], plane_y] = 2 * rotation * flip
+    return M, K, G
+
+def whirl_root_indices(evalues, n_modes):
+    """
+    Indices of the first n_modes whirl roots among the eigenvalues of a
+    rotor, ordered by natural frequency. Conjugate roots are dropped, and so
+    are rigid-body (|lambda| < 1 rad/s) and overdamped (damping ratio above
+    0.995) roots: with no axial or torsional support those are
+    ill-conditioned and vary between otherwise identical models.
+    """
+    evalues = np.asarray(evalues)
+    wn      = np.abs(evalues)
+    keep    = np.flatnonzero((wn > 1.0) & (evalues.imag > 0.1 * wn))
+    return keep[np.argsort(wn[keep])][:n_modes]
+
+def select_whirl_roots(evalues, n_modes):
+    """
+    First n_modes whirl roots among the eigenvalues of a rotor (see
+    whirl_root_indices).
+    """
+    evalues = np.asarray(evalues)
+    return evalues[whirl_root_indices(evalues, n_modes)]
+
+def mode_assurance(a, b):
+    """
+    Modal assurance criterion between the mode shapes (columns) of a and
+    b, (a.shape[1], b.shape[1]): 1 for the same shape, 0 for orthogonal.
+    """
+    product = np.abs(a.conj().T @ b)**2
+    return product / np.outer(np.sum(np.abs(a)**2, axis=0),
+                              np.sum(np.abs(b)**2, axis=0))
+
+def track_whirl_modes(whirl_modes, speeds, n_modes, n_candidates=None,
+                      min_mac=0.2):
+    """
+    Damped natural frequencies (rad/s) of the first n_modes whirl modes at
+    speeds[0], followed over speeds: a (len(speeds), n_modes) array.
+
+    whirl_modes(speed, n) returns the first n whirl roots at speed and
+    their mode shapes (columns). At each speed, the tracked modes are
+    matched to the first n_candidates roots (default: 2 n_modes) by mode
+    shape (MAC) and relative frequency shift, so roots appearing below them
+    do not shift the columns. A mode whose match has a MAC below min_mac
+    is lost, and nan from there on, as are modes not found at speeds[0].
+
+    Columns are in order of frequency at speeds[1]: at zero speed the
+    forward and backward whirl of a mode are degenerate, and either may
+    come first.
+    """
+    if n_candidates is None:
+        n_candidates = 2 * n_modes
+    wd = np.full((len(speeds), n_modes), np.nan)
+    roots, shapes = whirl_modes(speeds[0], n_modes)
+    columns = np.arange(len(roots))
+    wd[0, columns] = roots.imag
+
+    for i in range(1, len(speeds)):
+        if len(columns) == 0:
+            break
+        candidates, candidate_shapes = whirl_modes(speeds[i], n_candidates)
+        mac   = mode_assurance(shapes, candidate_shapes)
+        shift = np.abs(candidates - roots[:, None]) / np.abs(roots[:, None])
+        rows, matches = linear_sum_assignment(shift - mac)
+        found = mac[rows, matches] >= min_mac
+        rows, matches = rows[found], matches[found]
+
+        columns = columns[rows]
+        roots   = candidates[matches]
+        shapes  = candidate_shapes[:, matches]
+        wd[i, columns] = roots.imag
+    if len(speeds) > 1:
+        wd = wd[:, np.argsort(wd[1], kind="stable")]
+    return wd
+
+def synchronous_crossings(speeds, wd):
+    """
+    Critical speeds (rad/s) where the damped natural frequencies wd cross
+    the synchronous (1X) line, by linear interpolation on the speed grid.
+
+    speeds is (..., n_speeds) and wd (..., n_speeds, n_modes), with each
+    mode in its own column over the speeds (see track_whirl_modes); returns
+    the first crossing of each mode, (..., n_modes), nan if it falls
+    outside the speed grid. Crossings are not interpolated across nan.
+    """
+    speeds = speeds[..., None]
+    gap    = wd - speeds
+    cross  = (gap[..., :-1, :] > 0) & (gap[..., 1:, :] <= 0)
+    i      = np.argmax(cross, axis=-2)[..., None, :]
+
+    gap_l   = np.take_along_axis(gap[..., :-1, :], i, axis=-2)[..., 0, :]
+    gap_r   = np.take_along_axis(gap[..., 1:, :], i, axis=-2)[..., 0, :]
+    speed_l = np.take_along_axis(speeds[..., :-1, :], i, axis=-2)[..., 0, :]
+    speed_r = np.take_along_axis(speeds[..., 1:, :], i, axis=-2)[..., 0, :]
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        critical = speed_l + gap_l / (gap_l - gap_r) * (speed_r - speed_l)
+    return np.where(cross.any(axis=-2), critical, np.nan)
+
+class BeamRotor:
+    """
+    Sparse beam finite element model of a rotor_model_data() description.
+
+    M0, K0 and G0 (scipy.sparse CSC matrices) hold the shaft elements and
+    the rigid disks; bearing and seal coefficients are added at their nodes
+    for each speed, interpolated linearly in their speed tables. The
+    equations of motion are M q'' + (C + speed G0) q' + K q = f, as in ROSS.
+    """
+    def __init__(self, data):
+        """
+        """
+        mesh = data["mesh"]
+        _, rho, e, nu = data["material"]
+        self.mesh     = mesh
+        self.n_nodes  = mesh.n_nodes
+        self.ndof     = number_dof * mesh.n_nodes
+        self.bearings = data["bearings"] + data["seals"]
+
+        Me, Ke, Ge = element_matrices(mesh.element_length,
+                                      mesh.element_diameter, rho, e, nu)
+        dofs = number_dof * np.arange(mesh.n_elements)[:, None] + \
+               np.arange(2 * number_dof)
+        rows = np.broadcast_to(dofs[:, :, None], Me.shape).ravel()
+        cols = np.broadcast_to(dofs[:, None, :], Me.shape).ravel()
+
+        # rigid disks: mass at x and y, inertias at alpha and beta
+        disk_rows, disk_cols, disk_m, disk_g = [], [], [], []
+        for disk in data["disks"]:
+            x, y, alpha, beta = number_dof * disk["n"] + np.arange(4)
+            disk_rows += [x, y, alpha, beta]
+            disk_cols += [x, y, alpha, beta]
+            disk_m    += [disk["m"], disk["m"], disk["Id"], disk["Id"]]
+            disk_g    += [(alpha, beta, disk["Ip"]),
+                          (beta, alpha, -disk["Ip"])]
+
+        shape = (self.ndof, self.ndof)
+        self.M0 = sp.coo_matrix((np.concatenate((Me.ravel(), disk_m)),
+                                 (np.concatenate((rows, disk_rows)),
+                                  np.concatenate((cols, disk_cols)))),
+                                shape=shape).tocsc()
+        self.K0 = sp.coo_matrix((Ke.ravel(), (rows, cols)),
+                                shape=shape).tocsc()
+        g_rows, g_cols, g_values = np.array(disk_g).reshape(-1, 3).T
+        self.G0 = sp.coo_matrix((np.concatenate((Ge.ravel(), g_values)),
+                                 (np.concatenate((rows, g_rows)),
+                                  np.concatenate((cols, g_cols)))),
+                                shape=shape).tocsc()
+
+    def bearing_matrix(self, speed, direct):
+        """
+        Sparse matrix of the bearing and seal coefficients (direct is
+        ("kxx", "kyy") or ("cxx", "cyy")) at speed.
+        """
+        dofs, values = [], []
+        for bearing in self.bearings:
+            x = number_dof * bearing["n"]
+            for dof, name in ((x, direct[0]), (x + 1, direct[1])):
+                table = np.atleast_1d(bearing[name])
+                if bearing["frequency"] is None:
+                    value = table[0]
+                else:
+                    value = np.interp(speed, bearing["frequency"], table)
+                dofs.append(dof)
+                values.append(value)
+        return sp.coo_matrix((values, (dofs, dofs)),
+                             shape=(self.ndof, self.ndof)).tocsc()
+
+    def M(self, speed=0.0):
+        return self.M0
+
+    def K(self, speed):
+        return self.K0 + self.bearing_matrix(speed, ("kxx", "kyy"))
+
+    def C(self, speed):
+        return self.bearing_matrix(speed, ("cxx", "cyy"))
+
+    def first_order_form(self, speed):
+        """
+        Sparse A and B of the first-order form B z' = A z of the equations
+        of motion at speed, z = (q, q').
+        """
+        I = sp.identity(self.ndof, format="csc")
+        A = sp.bmat([[None, I],
+                     [-self.K(speed), -(self.C(speed) + speed * self.G0)]],
+                    format="csc")
+        B = sp.block_diag((I, self.M(speed)), format="csc")
+        return A, B
+
+    def whirl_roots(self, speed, n_modes):
+        """
+        Eigenvalues of the first n_modes whirl modes at speed (see
+        select_whirl_roots), from the first-order form of the equations of
+        motion, solved with shift-invert around zero.
+        """
+        A, B = self.first_order_form(speed)
+        k = min(4*n_modes + 8, 2*self.ndof - 2)
+        evalues = spla.eigs(A, k=k, M=B, sigma=0.0,
+                            return_eigenvectors=False)
+        return select_whirl_roots(evalues, n_modes)
+
+    def whirl_modes(self, speed, n_modes):
+        """
+        Whirl roots as in whirl_roots, and their mode shapes (x, y, alpha
+        and beta of every node), (ndof, n_modes).
+        """
+        A, B = self.first_order_form(speed)
+        k = min(4*n_modes + 8, 2*self.ndof - 2)
+        evalues, evectors = spla.eigs(A, k=k, M=B, sigma=0.0)
+        modes = whirl_root_indices(evalues, n_modes)
+        return evalues[modes], evectors[:self.ndof, modes]
+
+    def natural_frequencies(self, speed, n_modes):
+        return np.abs(self.whirl_roots(speed, n_modes))
+
+    def campbell(self, speeds, n_modes):
+        """
+        Damped natural frequencies (rad/s) of the first n_modes whirl modes
+        at speeds[0], tracked over speeds (see track_whirl_modes): a
+        (len(speeds), n_modes) array, nan where a mode was not found.
+        """
+        return track_whirl_modes(self.whirl_modes, speeds, n_modes)
+
+    def critical_speeds(self, speeds, n_modes):
+        """
+        Synchronous critical speeds (rad/s) of the first n_modes modes over
+        the speeds grid (see synchronous_crossings).
+        """
+        speeds = np.asarray(strip_units(speeds, "angular_velocity"),
+                            dtype=float)
+        return synchronous_crossings(speeds, self.campbell(speeds, n_modes))
+
+def create_beam_rotor(rotor, element_dx, mesh=None, speeds=None):
+    """
+    Discretizes a Rotor (see discretize_rotor) and builds its BeamRotor.
+    Bearing coefficients are tabulated at speeds (rad/s, default: their own
+    speed tables).
+    """
+    if mesh is None:
+        mesh = discretize_rotor(rotor, element_dx)
+    if speeds is not None:
+        speeds = strip_units(speeds, "angular_velocity")
+    return BeamRotor(rotor_model_data(rotor, mesh, speeds))
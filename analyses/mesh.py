@@ -0,0 +1,298 @@
+"""
+Shaft discretization and model descriptions shared by the rotordynamic
+models. Pure NumPy (no ROSS), all values in SI base units.
+"""
+
+import sys
+
+import numpy as np
+
+from .. import strip_units
+from .. import cache
+
+class ShaftMesh:
+    """
+    Discretized rotor layout.
+
+    Element i spans nodes i and i+1, has length element_length[i] and outer
+    diameter element_diameter[i], and belongs to shaft segment
+    element_segment[i]. bearing_nodes, disk_nodes and seal_nodes list
+    (component index, node) pairs in axial order, the index referring to
+    rotor.bearings, rotor.disks and rotor.seals.
+    """
+    def __init__(self, element_length, element_diameter, element_segment,
+                 bearing_nodes, disk_nodes, seal_nodes=()):
+        """
+        """
+        self.element_length   = np.asarray(element_length, dtype=float)
+        self.element_diameter = np.asarray(element_diameter, dtype=float)
+        self.element_segment  = np.asarray(element_segment, dtype=int)
+        self.bearing_nodes    = list(bearing_nodes)
+        self.disk_nodes       = list(disk_nodes)
+        self.seal_nodes       = list(seal_nodes)
+
+    @property
+    def n_elements(self):
+        return len(self.element_length)
+
+    @property
+    def n_nodes(self):
+        return len(self.element_length) + 1
+
+    @property
+    def nodes_x(self):
+        """
+        Axial node positions (m).
+        """
+        return np.concatenate(([0.0], np.cumsum(self.element_length)))
+
+    def key(self):
+        """
+        Hashable description of the mesh geometry and component nodes.
+        """
+        return (self.element_length.tobytes(),
+                self.element_diameter.tobytes(),
+                tuple(self.bearing_nodes),
+                tuple(self.disk_nodes),
+                tuple(self.seal_nodes))
+
+def uniform_lengths(length, element_dx):
+    """
+    Smallest number of equal elements no longer than element_dx.
+    """
+    # round off conversion noise before taking the ceiling
+    n_elements = max(0, int(np.ceil(np.round(length / element_dx, 9))))
+    return np.full(n_elements, length / n_elements)
+
+def graded_lengths(length, refine_left, refine_right, element_dx, dx_max,
+                   growth):
+    """
+    Element lengths for a sub-segment graded away from its refined ends:
+    the target size is element_dx at a refined end and grows linearly with
+    distance (by a factor growth per element) up to dx_max. Nodes are placed
+    by equidistributing the integral of 1/size.
+    """
+    x = np.linspace(0.0, length, 257)
+    distance = np.full_like(x, np.inf)
+    if refine_left:
+        distance = np.minimum(distance, x)
+    if refine_right:
+        distance = np.minimum(distance, length - x)
+    size = np.minimum(dx_max, element_dx + (growth - 1) * distance)
+
+    density = np.concatenate(([0.0], np.cumsum(
+            (1/size[1:] + 1/size[:-1]) / 2 * np.diff(x))))
+    n_elements = max(1, int(np.ceil(np.round(density[-1], 9))))
+    nodes = np.interp(np.linspace(0.0, density[-1], n_elements + 1),
+                      density, x)
+    nodes[0], nodes[-1] = 0.0, length
+
+    return np.diff(nodes)
+
+def mesh_arrays(mesh):
+    """
+    The mesh as a dict of arrays (for the persistent cache).
+    """
+    return {"element_length":   mesh.element_length,
+            "element_diameter": mesh.element_diameter,
+            "element_segment":  mesh.element_segment,
+            "bearing_nodes":    np.array(mesh.bearing_nodes, dtype=int),
+            "disk_nodes":       np.array(mesh.disk_nodes, dtype=int),
+            "seal_nodes":       np.array(mesh.seal_nodes, dtype=int)}
+
+def mesh_from_arrays(arrays):
+    """
+    Inverse of mesh_arrays.
+    """
+    nodes = [[(int(index), int(node)) for index, node in
+              arrays[name].reshape(-1, 2)]
+             for name in ("bearing_nodes", "disk_nodes", "seal_nodes")]
+    return ShaftMesh(arrays["element_length"], arrays["element_diameter"],
+                     arrays["element_segment"], *nodes)
+
+def discretize_rotor(rotor, element_dx, dx_max=None, growth=1.3,
+                     disk_cache=None):
+    """
+    Splits every shaft segment at the centers of the bearings, disks and
+    seals it carries, then divides each sub-segment into the smallest number
+    of equal elements no longer than element_dx. Components at the same
+    position share a node, and components at a segment end use the node
+    between the segments.
+
+    With dx_max, the mesh is graded instead: element_dx is the element size
+    at components and at diameter steps, and elements grow by up to a
+    factor growth per element, to at most dx_max, along uniform spans.
+
+    All component centers are merged into one sorted array and each segment
+    finds its components with a searchsorted, so the cost grows as
+    n log n with the number of segments and components.
+
+    Meshes are stored in disk_cache (by default the persistent cache, when
+    enabled, see pump_analysis.cache), keyed by the shaft segments,
+    component positions and mesh settings.
+    """
+    element_dx = strip_units(element_dx, "length")
+    if dx_max is not None:
+        dx_max = max(strip_units(dx_max, "length"), element_dx)
+    shaft = rotor.shaft
+
+    if disk_cache is None:
+        disk_cache = cache.default_cache()
+    if disk_cache is not None:
+        layouts = (rotor.bearings, rotor.disks, rotor.seals)
+        key = cache.stable_hash("ShaftMesh", cache.format_version,
+                                cache.code_hash(sys.modules[__name__]),
+                                shaft.columns[:, :shaft.n_segments],
+                                [layout.xc for layout in layouts],
+                                element_dx, dx_max, growth)
+        stored = disk_cache.get(key)
+        if stored is not None:
+            return mesh_from_arrays(stored)
+        mesh = build_mesh(rotor, element_dx, dx_max, growth)
+        disk_cache.put(key, mesh_arrays(mesh))
+        return mesh
+    return build_mesh(rotor, element_dx, dx_max, growth)
+
+def build_mesh(rotor, element_dx, dx_max, growth):
+    """
+    discretize_rotor without the cache (lengths in m).
+    """
+    shaft = rotor.shaft
+    x0, l, d = shaft.x0, shaft.l, shaft.d
+
+    # component centers by ascending x (each layout is already sorted)
+    layouts = (rotor.bearings, rotor.disks, rotor.seals)
+    component_x     = np.concatenate([layout.xc[layout.order]
+                                      for layout in layouts])
+    component_kind  = np.concatenate([np.full(len(layout), kind)
+                                      for kind, layout in enumerate(layouts)])
+    component_index = np.concatenate([layout.order for layout in layouts])
+    order           = np.argsort(component_x, kind="stable")
+    component_x     = component_x[order]
+    component_kind  = component_kind[order]
+    component_index = component_index[order]
+
+    # components with x_left <= x < x_right, and x <= x_right at the end
+    first = np.searchsorted(component_x, x0, side="left")
+    last  = np.searchsorted(component_x, x0 + l, side="left")
+    if shaft.n_segments > 0:
+        last[-1] = np.searchsorted(component_x, x0[-1] + l[-1], side="right")
+
+    # diameter steps at the segment ends
+    steps      = d[1:] != d[:-1]
+    step_left  = np.concatenate(([False], steps))
+    step_right = np.concatenate((steps, [False]))
+
+    element_length   = []
+    element_diameter = []
+    element_segment  = []
+    component_nodes  = ([], [], [])
+
+    node_id = 0
+    for i in range(shaft.n_segments):
+        x_ref = 0.0
+        refine_left = step_left[i]
+        for k in range(first[i], last[i] + 1):
+            segment_end = k == last[i]
+            if segment_end:
+                x = (x0[i] + l[i]) - x0[i]
+            else:
+                x = component_x[k] - x0[i]
+
+            sub_length = x - x_ref
+            if sub_length > 0:
+                x_ref = x
+                if dx_max is None:
+                    lengths = uniform_lengths(sub_length, element_dx)
+                else:
+                    refine_right = not segment_end or step_right[i]
+                    lengths = graded_lengths(sub_length, refine_left,
+                                             refine_right, element_dx,
+                                             dx_max, growth)
+                n_elements = len(lengths)
+                element_length.extend(lengths)
+                element_diameter.extend([d[i]] * n_elements)
+                element_segment.extend([i] * n_elements)
+                node_id += n_elements
+
+            if not segment_end:
+                component_nodes[component_kind[k]].append(
+                        (int(component_index[k]), node_id))
+                refine_left = True
+
+    bearing_nodes, disk_nodes, seal_nodes = component_nodes
+    return ShaftMesh(element_length, element_diameter, element_segment,
+                     bearing_nodes, disk_nodes, seal_nodes)
+
+def rotor_model_data(rotor, mesh, speeds=None):
+    """
+    Picklable description of a rotor model in SI base units: the mesh, the
+    shaft material properties, the bearing, seal and disk element data at
+    their nodes, and the impeller design speed (rad/s, nan without an
+    impeller).
+
+    Bearing and seal coefficients are evaluated in one vectorized call per
+    component, at the bearing axial load and at speeds (rad/s, default: the
+    speeds of the coefficient table). Seals without coefficients are left
+    out of the model.
+    """
+    material = rotor.shaft.material
+
+    bearings = []
+    for index, node in mesh.bearing_nodes:
+        layout = rotor.bearings[index]
+        coefficients = layout["model"].coefficients
+        if coefficients is None:
+            raise ValueError("Bearing " + layout["model"].name + " has no " + \
+                             "rotordynamic coefficients.")
+        bearing_speeds = coefficients.speed if speeds is None else speeds
+        bearing_speeds = np.atleast_1d(np.asarray(bearing_speeds, dtype=float))
+        kxx, kyy, cxx, cyy = coefficients.evaluate(bearing_speeds,
+                                                   layout["axial_load"])
+        frequency = None
+        if len(bearing_speeds) > 1:
+            frequency = bearing_speeds
+        bearings.append({"n":         node,
+                         "kxx":       kxx,
+                         "kyy":       kyy,
+                         "cxx":       cxx,
+                         "cyy":       cyy,
+                         "frequency": frequency})
+
+    seals = []
+    for index, node in mesh.seal_nodes:
+        coefficients = rotor.seals[index]["model"].coefficients
+        if coefficients is None:
+            continue
+        seal_speeds = coefficients.speed if speeds is None else speeds
+        seal_speeds = np.atleast_1d(np.asarray(seal_speeds, dtype=float))
+        kxx, kyy, cxx, cyy = coefficients.evaluate(seal_speeds)
+        frequency = None
+        if len(seal_speeds) > 1:
+            frequency = seal_speeds
+        seals.append({"n":         node,
+                      "kxx":       kxx,
+                      "kyy":       kyy,
+                      "cxx":       cxx,
+                      "cyy":       cyy,
+                      "frequency": frequency})
+
+    disks = []
+    for index, node in mesh.disk_nodes:
+        disk = rotor.disks[index]
+        disks.append({"n":  node,
+                      "m":  disk["mass"],
+                      "Ip": disk["polar_inertia"],
+                      "Id": disk["diametral_inertia"]})
+
+    design_speed = np.nan
+    if rotor.impeller is not None:
+        design_speed = rotor.impeller["impeller"].design_point.si["omega"]
+
+    return {"mesh":         mesh,
+            "material":     (material.name, material.si["rho"],
+                             material.si["e"], material.si["nu"]),
+            "bearings":     bearings,
+            "seals":        seals,
+            "disks":        disks,
+            "design_speed": design_speed}
@@ -0,0 +1,416 @@
+"""
+Gradient-based tuning of a rotor: shaft segment diameters and lengths (and
+with them the bearing and disk positions) and bearing stiffness are
+adjusted to keep the synchronous critical speeds a margin away from the
+design speed, at the smallest rotating mass. Each critical speed is the
+intersection of a tracked whirl mode with the 1X line, and its sensitivity
+comes from the eigenvalue sensitivities of the beam model matrices
+(analyses.beam) at that speed, with no model rebuild per variable. All
+values in SI base units.
+"""
+
+import numpy as np
+import scipy.linalg as la
+from scipy.optimize import minimize
+
+from .. import strip_units
+from .beam import (BeamRotor, element_matrices, mode_assurance, number_dof,
+                   whirl_root_indices)
+from .mesh import ShaftMesh, discretize_rotor, rotor_model_data
+
+class RotorDesignModel:
+    """
+    Beam model of a Rotor parametrized by design variables relative to the
+    nominal rotor (1 is nominal): the diameters of diameter_segments
+    (default: the segments without bearings or disks, whose bores fit the
+    shaft), the lengths of length_segments (default: all) and the bearing
+    stiffness kxx and kyy of stiffness_bearings (indices in rotor.bearings,
+    default: all). Elements keep their share of their segment length, so
+    bearings and disks move with the segment ends.
+
+    evaluate(x) returns the synchronous critical speeds, the whirl roots at
+    speed, the rotating mass and their gradients; bearing and seal
+    coefficients follow their speed tables. The last state is cached, so
+    the objective, constraint and Jacobian calls of one optimizer iteration
+    share one evaluation.
+    """
+    def __init__(self, rotor, element_dx, speed=None, n_modes=4,
+                 diameter_segments=None, length_segments=None,
+                 stiffness_bearings=None, mesh=None):
+        """
+        speed (rad/s) defaults to the impeller design speed.
+        """
+        if mesh is None:
+            mesh = discretize_rotor(rotor, element_dx)
+        if speed is None:
+            speed = rotor.impeller["impeller"].design_point.si["omega"]
+        shaft = rotor.shaft
+        if diameter_segments is None:
+            fitted = {layout["segment"] for layout in list(rotor.bearings)
+                                                      + list(rotor.disks)}
+            diameter_segments = [i for i in range(shaft.n_segments)
+                                 if i not in fitted]
+        if length_segments is None:
+            length_segments = range(shaft.n_segments)
+        if stiffness_bearings is None:
+            stiffness_bearings = range(len(rotor.bearings))
+
+        self.rotor   = rotor
+        self.mesh    = mesh
+        self.speed   = strip_units(speed, "angular_velocity")
+        self.n_modes = n_modes
+        self.data    = rotor_model_data(rotor, mesh)
+        _, self.rho, self.e, self.nu = self.data["material"]
+
+        position = {index: j for j, (index, _) in
+                    enumerate(mesh.bearing_nodes)}
+        self.diameter_segments  = np.array(diameter_segments, dtype=int)
+        self.length_segments    = np.array(length_segments, dtype=int)
+        self.stiffness_bearings = np.array([position[index] for index in
+                                            stiffness_bearings], dtype=int)
+        self.n_variables = len(self.diameter_segments) + \
+                           len(self.length_segments) + \
+                           len(self.stiffness_bearings)
+        self.variable_names = \
+            ["diameter " + str(i) for i in self.diameter_segments] + \
+            ["length " + str(i) for i in self.length_segments] + \
+            ["stiffness " + str(i) for i in stiffness_bearings]
+
+        self.state       = None
+        self.evaluations = 0
+        self.cache_hits  = 0
+
+    def segment_factors(self, x):
+        """
+        Diameter and length factors of every shaft segment, and stiffness
+        factors of the stiffness_bearings, from the design variables x.
+        """
+        x = np.asarray(x, dtype=float)
+        n_d, n_l = len(self.diameter_segments), len(self.length_segments)
+        n_segments = self.rotor.shaft.n_segments
+        diameter = np.ones(n_segments)
+        length   = np.ones(n_segments)
+        diameter[self.diameter_segments] = x[:n_d]
+        length[self.length_segments]     = x[n_d:n_d + n_l]
+        return diameter, length, x[n_d + n_l:]
+
+    def model_data(self, x):
+        """
+        rotor_model_data() description of the rotor at x.
+        """
+        diameter, length, stiffness = self.segment_factors(x)
+        mesh = self.mesh
+        data = dict(self.data)
+        data["mesh"] = ShaftMesh(
+                mesh.element_length * length[mesh.element_segment],
+                mesh.element_diameter * diameter[mesh.element_segment],
+                mesh.element_segment, mesh.bearing_nodes, mesh.disk_nodes,
+                mesh.seal_nodes)
+        data["bearings"] = [dict(bearing) for bearing in self.data["bearings"]]
+        for j, factor in zip(self.stiffness_bearings, stiffness):
+            for name in ("kxx", "kyy"):
+                data["bearings"][j][name] = self.data["bearings"][j][name] \
+                                            * factor
+        return data
+
+    def coefficient(self, j, name, speed):
+        """
+        Nominal coefficient name of bearing j of the model data at speed.
+        """
+        bearing = self.data["bearings"][j]
+        table = np.atleast_1d(bearing[name])
+        if bearing["frequency"] is None:
+            return table[0]
+        return np.interp(speed, bearing["frequency"], table)
+
+    def eigensolution(self, model, speed):
+        """
+        Eigenvalues and left and right eigenvectors of the first-order form
+        of the equations of motion of a BeamRotor at speed, and the
+        derivative of its quadratic pencil with respect to speed at lambda,
+        as a function.
+        """
+        n = model.ndof
+        M = model.M0.toarray()
+        K = model.K(speed).toarray()
+        C = (model.C(speed) + speed * model.G0).toarray()
+        I, Z = np.eye(n), np.zeros((n, n))
+        evalues, left, right = la.eig(np.block([[Z, I], [-K, -C]]),
+                                      np.block([[I, Z], [Z, M]]),
+                                      left=True, right=True)
+
+        # bearing tables are piecewise linear in speed
+        h  = 1e-6 * max(speed, 1.0)
+        dK = ((model.K(speed + h) - model.K(speed - h)) / (2*h)).toarray()
+        dC = ((model.C(speed + h) - model.C(speed - h)) / (2*h)).toarray() \
+             + model.G0.toarray()
+        def pencil_speed(root):
+            return dK + root * dC
+        return evalues, left, right, M, pencil_speed
+
+    def root_gradients(self, data, model, speed, eigensolution, modes):
+        """
+        Derivatives of the roots modes of an eigensolution at speed with
+        respect to the design variables ((n_variables, n_modes)) and to
+        speed ((n_modes,)).
+
+        With q'' M + q' (C + speed G) + q K = 0, a root lambda with right
+        and left eigenvectors x and y moves by
+            -y^H (lambda**2 dM + lambda (dC + speed dG) + dK) x
+             / y^H (2 lambda M + C + speed G) x
+        where dM, dG and dK are the shaft element matrix derivatives
+        (complex step) and the bearing stiffness; with respect to speed,
+        dC and dK are the slopes of the bearing tables and dG is G.
+        """
+        evalues, left, right, M, pencil_speed = eigensolution
+        mesh  = data["mesh"]
+        n     = model.ndof
+        roots = evalues[modes]
+        u, v  = right[:n, modes], left[n:, modes]
+        norm  = np.sum(left[:n, modes].conj() * u, axis=0) + \
+                np.sum(v.conj() * (M @ right[n:, modes]), axis=0)
+
+        d_speed = np.array([-v[:, m].conj() @ pencil_speed(root) @ u[:, m]
+                            for m, root in enumerate(roots)]) / norm
+
+        # element matrix derivatives, (n_elements, 8, 8) each
+        L, D = mesh.element_length, mesh.element_diameter
+        h = 1e-20
+        dL = [matrix.imag / (h * L[:, None, None]) for matrix in
+              element_matrices(L * (1 + 1j*h), D, self.rho, self.e, self.nu)]
+        dD = [matrix.imag / (h * D[:, None, None]) for matrix in
+              element_matrices(L, D * (1 + 1j*h), self.rho, self.e, self.nu)]
+        dofs = number_dof * np.arange(mesh.n_elements)[:, None] + \
+               np.arange(2 * number_dof)
+        u_e, v_e = u[dofs], v[dofs].conj()
+        def element_derivatives(dM, dK, dG):
+            P = dK[..., None] + roots * speed * dG[..., None] \
+                + roots**2 * dM[..., None]
+            return -np.einsum("eim,eijm,ejm->em", v_e, P, u_e) / norm
+        dL, dD = element_derivatives(*dL), element_derivatives(*dD)
+
+        # segment factors scale their element lengths and diameters
+        n_segments = self.rotor.shaft.n_segments
+        segment = mesh.element_segment
+        def per_segment(values):
+            total = np.zeros((n_segments,) + values.shape[1:], dtype=values.dtype)
+            np.add.at(total, segment, values)
+            return total
+        L0, D0 = self.mesh.element_length, self.mesh.element_diameter
+        d_diameter = per_segment(dD * D0[:, None])[self.diameter_segments]
+        d_length   = per_segment(dL * L0[:, None])[self.length_segments]
+
+        d_stiffness = []
+        for j in self.stiffness_bearings:
+            x_dof = number_dof * self.data["bearings"][j]["n"]
+            d_stiffness.append(-(v[x_dof].conj()
+                                 * self.coefficient(j, "kxx", speed)
+                                 * u[x_dof] + v[x_dof + 1].conj()
+                                 * self.coefficient(j, "kyy", speed)
+                                 * u[x_dof + 1]) / norm)
+        d_stiffness = np.reshape(d_stiffness, (-1, len(modes)))
+        return np.concatenate((d_diameter, d_length, d_stiffness)), d_speed
+
+    def critical_speed(self, data, model, root, shape, tolerance=1e-8,
+                       max_iterations=20, min_mac=0.2):
+        """
+        Speed where the whirl mode of root and shape (at speed) crosses the
+        1X line, and its gradient with respect to x. The mode is tracked
+        from speed by Newton steps on wd(s) - s = 0, each to the whirl root
+        that best matches its mode shape (MAC) and frequency; the gradient
+        is dwd/dx / (1 - dwd/ds) at the crossing. Returns nan and a zero
+        gradient if the iteration finds no crossing, or loses the mode (no
+        root with a MAC of min_mac).
+        """
+        crossing = root.imag
+        for _ in range(max_iterations):
+            solution = self.eigensolution(model, crossing)
+            evalues  = solution[0]
+            whirl    = whirl_root_indices(evalues, len(evalues))
+            shapes   = solution[2][:model.ndof, whirl]
+            mac      = mode_assurance(shape[:, None], shapes)[0]
+            best     = np.argmax(mac - np.abs(evalues[whirl] - root)
+                                 / np.abs(root))
+            if mac[best] < min_mac:
+                break
+            mode, root, shape = whirl[best], evalues[whirl[best]], \
+                                shapes[:, best]
+            gradient, d_speed = self.root_gradients(data, model, crossing,
+                                                    solution, [mode])
+            slope    = d_speed[0].imag - 1
+            step     = (root.imag - crossing) / slope
+            if not np.isfinite(step) or crossing - step <= 0:
+                break
+            crossing -= step
+            if abs(step) < tolerance * crossing:
+                return crossing, gradient[:, 0].imag / -slope
+        return np.nan, np.zeros(self.n_variables)
+
+    def evaluate(self, x):
+        """
+        Synchronous critical speeds of the first n_modes whirl modes at
+        speed and their gradients with respect to x, the whirl roots at
+        speed and theirs, and the rotating mass (kg, shaft and disks) and
+        its gradient, as a dict with keys x, critical_speeds,
+        critical_speeds_gradient ((n_modes, n_variables)), roots,
+        roots_gradient ((n_modes, n_variables), complex), mass and
+        mass_gradient.
+
+        A critical speed is nan where its mode does not cross the 1X line
+        (see critical_speed), or where it converges to the crossing of
+        another mode; the mode whose root at speed is closest to the
+        crossing keeps it.
+        """
+        x = np.asarray(x, dtype=float)
+        if self.state is not None and np.array_equal(x, self.state["x"]):
+            self.cache_hits += 1
+            return self.state
+        self.evaluations += 1
+
+        data     = self.model_data(x)
+        mesh     = data["mesh"]
+        model    = BeamRotor(data)
+        solution = self.eigensolution(model, self.speed)
+        modes    = whirl_root_indices(solution[0], self.n_modes)
+        roots    = solution[0][modes]
+        roots_gradient, _ = self.root_gradients(data, model, self.speed,
+                                                solution, modes)
+        crossings = [self.critical_speed(data, model, root,
+                                         solution[2][:model.ndof, mode])
+                     for root, mode in zip(roots, modes)]
+        critical = np.array([crossing for crossing, _ in crossings])
+        critical_gradient = np.reshape([gradient for _, gradient in
+                                        crossings],
+                                       (len(roots), self.n_variables))
+
+        # one crossing per mode
+        kept = []
+        for k in np.argsort(np.abs(roots.imag - critical)):
+            if not np.isfinite(critical[k]):
+                continue
+            if any(abs(critical[k] - critical[m]) <= 1e-6 * critical[k]
+                   for m in kept):
+                critical[k] = np.nan
+                critical_gradient[k] = 0.0
+            else:
+                kept.append(k)
+
+        segment = mesh.element_segment
+        def per_segment(values):
+            total = np.zeros(self.rotor.shaft.n_segments)
+            np.add.at(total, segment, values)
+            return total
+        L, D   = mesh.element_length, mesh.element_diameter
+        L0, D0 = self.mesh.element_length, self.mesh.element_diameter
+        area = np.pi/4 * D**2
+        mass = self.rho * np.sum(area * L) + \
+               sum(disk["m"] for disk in data["disks"])
+        mass_gradient = np.concatenate((
+                per_segment(self.rho * np.pi/2 * D * L * D0)
+                [self.diameter_segments],
+                per_segment(self.rho * area * L0)[self.length_segments],
+                np.zeros(len(self.stiffness_bearings))))
+
+        self.state = {"x":                        x.copy(),
+                      "critical_speeds":          critical,
+                      "critical_speeds_gradient": critical_gradient,
+                      "roots":                    roots,
+                      "roots_gradient":           roots_gradient.T,
+                      "mass":                     mass,
+                      "mass_gradient":            mass_gradient}
+        return self.state
+
+def optimize_rotor(rotor, element_dx, required_margin=0.2, n_modes=4,
+                   speed=None, diameter_bounds=(0.8, 1.25),
+                   length_bounds=(0.8, 1.25), stiffness_bounds=(0.5, 2.0),
+                   diameter_segments=None, length_segments=None,
+                   stiffness_bearings=None, mesh=None, **options):
+    """
+    Minimizes the rotating mass of a Rotor over the design variables of its
+    RotorDesignModel, keeping the synchronous critical speed of each of the
+    first n_modes whirl modes at least required_margin (relative) away from
+    speed (default: design speed), on the side where it starts. Modes
+    without a crossing at the nominal design instead keep their damped
+    natural frequency at speed that margin away from it, a continuous
+    stand-in with its own gradient; so does a mode whose crossing is lost
+    at a later iterate. The bounds are
+    relative to the nominal values; segments are not shortened below the
+    length of the components they carry. Solved with SLSQP on the analytic
+    gradients; options are passed on to scipy.optimize.minimize.
+
+    Returns the RotorDesignModel and a report dict with the optimal
+    variables x, the segment diameters and lengths (m), the bearing
+    stiffness factors, the critical speeds and damped natural frequencies
+    at speed (rad/s), the critical speed margins and the mass (kg) before
+    and after (nan without a crossing), the scipy result, and the model
+    evaluation and cache hit counts.
+    """
+    model = RotorDesignModel(rotor, element_dx, speed, n_modes,
+                             diameter_segments, length_segments,
+                             stiffness_bearings, mesh)
+    speed = model.speed
+    x0 = np.ones(model.n_variables)
+
+    # segments stay long enough for the components they carry
+    shaft = rotor.shaft
+    carried = np.zeros(shaft.n_segments)
+    for layout in (rotor.bearings, rotor.disks, rotor.seals):
+        np.add.at(carried, layout.segment, layout.x2 - layout.x1)
+    shortest = np.maximum(length_bounds[0], carried / shaft.l)
+    bounds = [diameter_bounds] * len(model.diameter_segments) + \
+             [(shortest[i], length_bounds[1])
+              for i in model.length_segments] + \
+             [stiffness_bounds] * len(model.stiffness_bearings)
+
+    start     = model.evaluate(x0)
+    critical0 = start["critical_speeds"]
+    crossing  = np.isfinite(critical0)
+    side      = np.where(np.where(crossing, critical0, start["roots"].imag)
+                         >= speed, 1.0, -1.0)
+    mass0     = start["mass"]
+
+    # constrained frequency of each mode: its critical speed, or its damped
+    # natural frequency at speed without one
+    def constrained(state):
+        use = crossing & np.isfinite(state["critical_speeds"])
+        return (np.where(use, state["critical_speeds"], state["roots"].imag),
+                np.where(use[:, None], state["critical_speeds_gradient"],
+                         state["roots_gradient"].imag))
+
+    def objective(x):
+        return model.evaluate(x)["mass"] / mass0
+    def objective_gradient(x):
+        return model.evaluate(x)["mass_gradient"] / mass0
+    def margins(x):
+        frequency, _ = constrained(model.evaluate(x))
+        return side * (frequency - speed) / speed - required_margin
+    def margins_gradient(x):
+        _, gradient = constrained(model.evaluate(x))
+        return side[:, None] * gradient / speed
+
+    result = minimize(objective, x0, jac=objective_gradient, bounds=bounds,
+                      method="SLSQP",
+                      constraints=[{"type": "ineq",
+                                    "fun":  margins,
+                                    "jac":  margins_gradient}],
+                      **options)
+
+    final = model.evaluate(result.x)
+    diameter, length, stiffness = model.segment_factors(result.x)
+    critical = final["critical_speeds"]
+    report = {"x":                       result.x,
+              "diameters":               shaft.d * diameter,
+              "lengths":                 shaft.l * length,
+              "stiffness":               stiffness,
+              "critical_speeds_initial": critical0,
+              "critical_speeds":         critical,
+              "wd_initial":              start["roots"].imag,
+              "wd":                      final["roots"].imag,
+              "margins_initial":         (critical0 - speed) / speed,
+              "margins":                 (critical - speed) / speed,
+              "mass_initial":            mass0,
+              "mass":                    final["mass"],
+              "result":                  result,
+              "evaluations":             model.evaluations,
+              "cache_hits":              model.cache_hits}
+    return model, report
@@ -0,0 +1,260 @@
+"""
+Off-design performance of Barske impellers: head, shaft power and efficiency
+over a grid of rotational speeds and volume flows, from the sized geometry.
+Pure NumPy, all values in SI base units.
+"""
+
+import time
+
+import numpy as np
+
+from .. import strip_units, g_n
+
+class PerformanceMap:
+    """
+    Gridded pump curves. head, power and efficiency have shape
+    impeller shape + (len(speeds), len(flows)): one map per impeller of an
+    ImpellerBarskeBatch, or a single (n_speed, n_flow) map for one impeller.
+    speeds (rad/s) and flows (m**3/s) are ascending.
+    """
+    def __init__(self, speeds, flows, head, power, efficiency):
+        """
+        """
+        self.speeds     = speeds
+        self.flows      = flows
+        self.head       = head
+        self.power      = power
+        self.efficiency = efficiency
+
+    def interpolate(self, speed, flow, field="head"):
+        """
+        Bilinear interpolation of a field ("head", "power" or "efficiency")
+        at speed (rad/s) and flow (m**3/s), broadcast against each other.
+        Only available for single-impeller maps.
+        """
+        from scipy.interpolate import RegularGridInterpolator
+        values = getattr(self, field)
+        if values.ndim != 2:
+            raise ValueError("Interpolation needs a single-impeller map.")
+        speed, flow = np.broadcast_arrays(strip_units(speed,
+                                                      "angular_velocity"),
+                                          strip_units(flow, "volume_flow"))
+        interpolator = RegularGridInterpolator((self.speeds, self.flows),
+                                               values)
+        return interpolator(np.stack((speed, flow), axis=-1))
+
+def head_model(impeller, speeds, trailing_axes=0, incidence_loss=0.8,
+               friction_loss=1.0):
+    """
+    Coefficients of the off-design head of an impeller at speeds (rad/s):
+    head = shutoff - incidence * (q - q_design)**2
+                   - friction * (q**2 - q_design**2)
+    with all four arrays broadcast between the impeller shape (extended by
+    trailing_axes unit axes) and speeds. See performance_map for the model.
+    """
+    si     = impeller.si
+    design = impeller.design_point
+
+    def expand(value):
+        value = np.asarray(value, dtype=float)
+        return value.reshape(value.shape + (1,) * trailing_axes)
+    d1, d2, b1, b2 = expand(si["d1"]), expand(si["d2"]), expand(si["b1"]), \
+                     expand(si["b2"])
+    kb1, kb2, psi  = expand(impeller.kb1), expand(impeller.kb2), \
+                     expand(impeller.psi)
+
+    u1 = speeds * d1/2
+    u2 = speeds * d2/2
+    a1 = np.pi * d1 * b1 * kb1
+    a2 = np.pi * d2 * b2 * kb2
+
+    shutoff   = ((1 + psi)**2 * u2**2 - u1**2) / (2*g_n)
+    incidence = incidence_loss / (2*g_n * a1**2)
+    friction  = friction_loss / (2*g_n * a2**2)
+    q_design  = design.si["q"] * speeds / design.si["omega"]
+    return shutoff, incidence, friction, q_design
+
+def performance_map(impeller, speeds, flows, incidence_loss=0.8,
+                    friction_loss=1.0, disk_friction=0.004):
+    """
+    Evaluates the head, shaft power and efficiency of a sized ImpellerBarske
+    (or ImpellerBarskeBatch) over the speeds × flows grid, as broadcast
+    array operations.
+
+    The loss-free head follows the Barske sizing relation at the actual tip
+    and eye speeds, ((1 + psi)**2 u2**2 - u1**2) / (2 g), and so matches the
+    design head at the design point. Off design, it is reduced by an
+    incidence loss incidence_loss * (cm1 - cm1*)**2 / (2 g), cm1* being the
+    design inlet velocity scaled with speed, and a through-flow loss
+    friction_loss * (cm2**2 - cm2***2) / (2 g) relative to the design
+    discharge velocity scaled with speed. The shaft power is the radial
+    blade Euler work rho Q u2**2 plus disk friction
+    disk_friction * rho * omega**3 * r2**5. Head becomes negative beyond
+    the run-out flow.
+    """
+    rho   = impeller.design_point.fluid.si["rho"]
+    omega = np.sort(np.ravel(strip_units(speeds, "angular_velocity")))
+    q     = np.sort(np.ravel(strip_units(flows, "volume_flow")))
+
+    # impeller shape + (1, 1) against the grid (n_speed, n_flow)
+    shutoff, incidence, friction, q_design = head_model(
+            impeller, omega[:, None], 2, incidence_loss, friction_loss)
+    q  = q[None, :]
+    r2 = np.asarray(impeller.si["d2"], dtype=float)[..., None, None] / 2
+    u2 = omega[:, None] * r2
+
+    head = shutoff - incidence * (q - q_design)**2 \
+                   - friction * (q**2 - q_design**2)
+
+    power      = rho * q * u2**2 + disk_friction * rho * omega[:, None]**3 \
+                                   * r2**5
+    efficiency = rho * g_n * q * head / power
+
+    return PerformanceMap(omega, q[0], head, power, efficiency)
+
+class OperatingPoints:
+    """
+    Batch of pump operating points. flow (m**3/s) and head (m) are nan where
+    no operating point was found (system static head above the pump
+    shut-off head, or no convergence), converged flags the solved points and
+    iterations counts the solver steps of each point. elapsed is the wall
+    time of the solve (s).
+    """
+    def __init__(self, flow, head, converged, iterations, elapsed):
+        """
+        """
+        self.flow       = flow
+        self.head       = head
+        self.converged  = converged
+        self.iterations = iterations
+        self.elapsed    = elapsed
+
+    def __len__(self):
+        return self.flow.size
+
+    @property
+    def throughput(self):
+        """
+        Solved points per second.
+        """
+        return np.count_nonzero(self.converged) / max(self.elapsed, 1e-12)
+
+def solve_operating_points(residual, q_low, q_high, xtol=1e-12, rtol=1e-10,
+                           max_iterations=100, max_expansions=60):
+    """
+    Finds, for every point of a batch, a flow q > q_low where
+    residual = pump head - system head changes sign from positive to
+    negative. residual(q, index) returns the residual and its derivative
+    with respect to q for the flattened batch points index.
+
+    q_low and q_high (flat arrays) start the brackets; q_high is doubled
+    until the residual is negative. Newton steps are then taken on the
+    unconverged points only, falling back to bisection when a step leaves
+    the bracket. Returns flow, converged and iterations arrays.
+    """
+    n     = q_low.size
+    every = np.arange(n)
+    lo, hi = q_low.astype(float), q_high.astype(float)
+    f_lo = residual(lo, every)[0]
+    f_hi = residual(hi, every)[0]
+
+    feasible = f_lo >= 0
+    for _ in range(max_expansions):
+        index = np.flatnonzero(feasible & (f_hi > 0))
+        if index.size == 0:
+            break
+        lo[index], f_lo[index] = hi[index], f_hi[index]
+        hi[index] = 2 * hi[index]
+        f_hi[index] = residual(hi[index], index)[0]
+    bracketed = feasible & (f_hi <= 0)
+
+    # regula falsi start inside the bracket
+    with np.errstate(invalid="ignore", divide="ignore"):
+        q = np.where(f_lo == f_hi, (lo + hi)/2,
+                     lo + f_lo * (hi - lo) / (f_lo - f_hi))
+    converged  = np.zeros(n, dtype=bool)
+    iterations = np.zeros(n, dtype=int)
+
+    active = np.flatnonzero(bracketed)
+    for _ in range(max_iterations):
+        if active.size == 0:
+            break
+        q_active = q[active]
+        f, df = residual(q_active, active)
+        iterations[active] += 1
+
+        above = f > 0
+        lo[active[above]]  = q_active[above]
+        hi[active[~above]] = q_active[~above]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            q_next = q_active - f / df
+        done = (f == 0) | (np.abs(q_next - q_active) <=
+                           xtol + rtol * np.abs(q_next))
+        q_next[f == 0] = q_active[f == 0]
+
+        outside = ~done & (~np.isfinite(q_next) | (q_next <= lo[active]) |
+                           (q_next >= hi[active]))
+        q_next[outside] = (lo[active[outside]] + hi[active[outside]]) / 2
+        q[active] = q_next
+        converged[active[done]] = True
+        active = active[~done]
+
+    return np.where(converged, q, np.nan), converged, iterations
+
+def operating_points(impeller, static_pressure=0.0, resistance=None,
+                     speed=None, fluid=None, incidence_loss=0.8,
+                     friction_loss=1.0, **options):
+    """
+    Operating points of an impeller (see performance_map for the head model)
+    against quadratic system curves
+        system head = static_pressure / (rho g) + resistance * Q**2
+    with static_pressure in Pa and resistance in m per (m**3/s)**2.
+
+    speed defaults to the design speed and fluid to the design point fluid;
+    a Fluid built with array properties gives one density per point. Without
+    resistance, each system curve passes through the design point (at the
+    design density). static_pressure, resistance, speed, the fluid density
+    and the impeller shape (ImpellerBarskeBatch) are broadcast against each
+    other, and all points are solved at once with solve_operating_points
+    (options are passed on to it).
+    """
+    design = impeller.design_point
+    if fluid is None:
+        fluid = design.fluid
+    if speed is None:
+        speed = design.si["omega"]
+    speed           = strip_units(speed, "angular_velocity")
+    static_pressure = strip_units(static_pressure, "pressure")
+    rho             = fluid.si["rho"]
+    if resistance is None:
+        static_head = static_pressure / (design.fluid.si["rho"] * g_n)
+        resistance  = (design.si["h"] - static_head) / design.si["q"]**2
+
+    start = time.perf_counter()
+    shutoff, incidence, friction, q_design = head_model(
+            impeller, speed, 0, incidence_loss, friction_loss)
+    columns = np.broadcast_arrays(shutoff, incidence, friction, q_design,
+                                  static_pressure / (rho * g_n), resistance)
+    shape = columns[0].shape
+    shutoff, incidence, friction, q_design, static_head, resistance = \
+        [np.ravel(column) for column in columns]
+
+    def residual(q, index):
+        dq = q - q_design[index]
+        f  = shutoff[index] - incidence[index] * dq**2 \
+             - friction[index] * (q**2 - q_design[index]**2) \
+             - static_head[index] - resistance[index] * q**2
+        df = -2 * (incidence[index] * dq + friction[index] * q
+                   + resistance[index] * q)
+        return f, df
+
+    flow, converged, iterations = solve_operating_points(
+            residual, np.zeros(shutoff.size), 2 * np.abs(q_design) + 1e-12,
+            **options)
+    head = static_head + resistance * flow**2
+    elapsed = time.perf_counter() - start
+
+    return OperatingPoints(flow.reshape(shape), head.reshape(shape),
+                           converged.reshape(shape),
+                           iterations.reshape(shape), elapsed)
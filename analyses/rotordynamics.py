@@ -1,103 +1,803 @@
 """
 """
 
+import os
 import ross as rs
 import numpy as np
-from operator import itemgetter
+import pandas as pd
+import scipy.linalg as la
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
 
-def create_ross_rotor(rotor, element_dx):
+from .. import init_worker, strip_units
+from .mesh import discretize_rotor, rotor_model_data
+from .beam import (select_whirl_roots, synchronous_crossings,
+                   track_whirl_modes, whirl_root_indices)
+
+class RossModelCache:
+    """
+    Cache of assembled ROSS rotors, keyed on shaft geometry, material and
+    discretization (element_dx and the component nodes it produces).
+
+    A cached model is reused when only the bearing coefficients or the
+    disk mass properties change: bearings do not enter the ROSS base
+    matrices and are simply swapped, and the disk contributions to the base
+    matrices are replaced in place of a full re-assembly.
+    """
+    def __init__(self, maxsize=16):
+        """
+        """
+        self.maxsize = maxsize
+        self.models  = OrderedDict()
+        self.hits    = 0
+        self.misses  = 0
+
+    def clear(self):
+        self.models.clear()
+        self.hits   = 0
+        self.misses = 0
+
+    def get(self, key):
+        model = self.models.get(key)
+        if model is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.models.move_to_end(key)
+        return model
+
+    def put(self, key, model):
+        self.models[key] = model
+        self.models.move_to_end(key)
+        while len(self.models) > self.maxsize:
+            self.models.popitem(last=False)
+
+ross_cache = RossModelCache()
+
+class FrozenMatrix:
+    """
+    Callable returning a precomputed, read-only element matrix. Stands in
+    for the ROSS element matrix methods on shared elements.
+    """
+    def __init__(self, matrix):
+        matrix.flags.writeable = False
+        self.matrix = matrix
+
+    def __call__(self):
+        return self.matrix
+
+class ShaftElementCache:
+    """
+    Shared shaft elements: identical elements (same length, diameter and
+    material) are built once, and their matrices computed once. ROSS takes
+    a shallow copy of every element it is given, so all copies share the
+    frozen matrices.
+    """
+    matrices = ("M", "K", "C", "G", "Kst")
+
+    def __init__(self, maxsize=4096):
+        """
+        """
+        self.maxsize  = maxsize
+        self.elements = OrderedDict()
+
+    def clear(self):
+        self.elements.clear()
+
+    def element(self, length, diameter, material):
+        """
+        """
+        key = (length, diameter, material.name, material.rho, material.E,
+               material.Poisson)
+        element = self.elements.get(key)
+        if element is None:
+            element = rs.ShaftElement(L              = length,
+                                      idl            = 0.0,
+                                      odl            = diameter,
+                                      material       = material,
+                                      shear_effects  = True,
+                                      rotary_inertia = True,
+                                      gyroscopic     = True)
+            for name in self.matrices:
+                setattr(element, name, FrozenMatrix(getattr(element, name)()))
+            self.elements[key] = element
+            while len(self.elements) > self.maxsize:
+                self.elements.popitem(last=False)
+        else:
+            self.elements.move_to_end(key)
+        return element
+
+shaft_element_cache = ShaftElementCache()
+
+def ross_material(material):
+    """
+    ROSS material from a (name, rho, E, Poisson) tuple in SI base units.
+    """
+    name, rho, e, nu = material
+    return rs.Material(name    = name,
+                       rho     = rho,
+                       E       = e,
+                       Poisson = nu)
+
+def ross_shaft_elements(mesh, material, element_cache=None):
+    """
+    Builds the ROSS shaft elements of a mesh. With an element_cache, runs
+    of identical elements reuse one element and its matrices.
+    """
+    if element_cache is not None:
+        return [element_cache.element(length, diameter, material)
+                for length, diameter in zip(mesh.element_length,
+                                            mesh.element_diameter)]
+
+    shaft_elements = []
+    for length, diameter in zip(mesh.element_length, mesh.element_diameter):
+        shaft_elements.append(
+                rs.ShaftElement(
+                    L              = length,
+                    idl            = 0.0,
+                    odl            = diameter,
+                    material       = material,
+                    shear_effects  = True,
+                    rotary_inertia = True,
+                    gyroscopic     = True
+                    )
+                )
+    return shaft_elements
+
+def ross_bearing_elements(data):
+    """
+    Bearing and seal elements, sorted by node as ROSS stores them.
+    """
+    bearing_elements = []
+    for bearing in data["bearings"]:
+        bearing_elements.append(
+                rs.BearingElement(
+                    n         = bearing["n"],
+                    kxx       = bearing["kxx"],
+                    kyy       = bearing["kyy"],
+                    cxx       = bearing["cxx"],
+                    cyy       = bearing["cyy"],
+                    frequency = bearing["frequency"]
+                    )
+                )
+    for seal in data["seals"]:
+        bearing_elements.append(
+                rs.SealElement(
+                    n         = seal["n"],
+                    kxx       = seal["kxx"],
+                    kyy       = seal["kyy"],
+                    cxx       = seal["cxx"],
+                    cyy       = seal["cyy"],
+                    frequency = seal["frequency"]
+                    )
+                )
+    return sorted(bearing_elements, key=lambda elm: elm.n)
+
+def ross_disk_elements(data):
+    """
+    """
+    disk_elements = []
+    for i, disk in enumerate(data["disks"]):
+        disk_elements.append(
+                rs.DiskElement(
+                    n   = disk["n"],
+                    m   = disk["m"],
+                    Ip  = disk["Ip"],
+                    Id  = disk["Id"],
+                    tag = "Disk " + str(i)
+                    )
+                )
+    return disk_elements
+
+def replace_components(model, bearing_elements, disk_elements):
+    """
+    Returns a copy of an assembled ROSS rotor with its bearing and disk
+    elements replaced by elements at the same nodes. Only the disk terms of
+    the base matrices are recomputed.
+
+    The given elements are copied, not modified. Besides the elements and
+    the base matrices (M0, C0, K0, G0, Ksdt0), the copy refreshes the
+    element tables (df, df_bearings, df_disks) and the mass properties m,
+    m_disks, CG, Ip and It; everything else (shaft elements, nodes, ndof,
+    ...) is shared with model. Memoized analysis results are not.
+    """
+    new = copy(model)
+    # do not share the memoized analysis results (methodtools caches)
+    for name in [name for name in vars(new) if name.startswith("__wire|")]:
+        del new.__dict__[name]
+
+    bearing_elements = [copy(elm) for elm in bearing_elements]
+    disk_elements    = [copy(elm) for elm in disk_elements]
+    for old, elm in zip(model.bearing_elements, bearing_elements):
+        elm.n_l = elm.n
+        elm.n_r = elm.n
+        elm.tag = old.tag
+        elm.dof_global_index = old.dof_global_index
+
+    new.M0    = model.M0.copy()
+    new.C0    = model.C0.copy()
+    new.K0    = model.K0.copy()
+    new.G0    = model.G0.copy()
+    new.Ksdt0 = model.Ksdt0.copy()
+    for old, elm in zip(model.disk_elements, disk_elements):
+        elm.tag = old.tag
+        elm.dof_global_index = old.dof_global_index
+        dofs = np.ix_(*2*[list(elm.dof_global_index.values())])
+        new.M0[dofs]    += elm.M() - old.M()
+        new.C0[dofs]    += elm.C() - old.C()
+        new.K0[dofs]    += elm.K() - old.K()
+        new.G0[dofs]    += elm.G() - old.G()
+        new.Ksdt0[dofs] += elm.Kdt() - old.Kdt()
+
+    new.bearing_elements = bearing_elements
+    new.disk_elements    = disk_elements
+    new.elements = (new.shaft_elements + new.disk_elements
+                    + new.bearing_elements + new.point_mass_elements)
+
+    # refresh the summary table rows of the replaced elements
+    new.df = model.df.copy()
+    layout_columns = {"n_l", "n_r", "nodes_pos_l", "nodes_pos_r", "y_pos",
+                      "y_pos_sup", "dof_global_index", "shaft_number", "tag",
+                      "type"}
+    for elm in bearing_elements + disk_elements:
+        row = new.df.index[new.df.tag == elm.tag][0]
+        for column, value in vars(elm).items():
+            if column in new.df.columns and column not in layout_columns:
+                new.df.at[row, column] = value
+    new.df_bearings = pd.DataFrame([elm.summary()
+                                    for elm in bearing_elements])
+    new.df_disks    = pd.DataFrame([elm.summary()
+                                    for elm in disk_elements])
+    new.df_bearings["shaft_number"] = np.zeros(len(new.df_bearings))
+    new.df_disks["shaft_number"]    = np.zeros(len(new.df_disks))
+
+    # mass properties
+    nodes_pos    = np.asarray(new.nodes_pos)
+    new.m_disks  = np.sum([disk.m for disk in disk_elements])
+    new.m        = new.m_disks + new.m_shaft
+    CG_sh        = np.sum([sh.m * sh.axial_cg_pos
+                           for sh in new.shaft_elements]) / new.m
+    CG_dsk       = np.sum([disk.m * nodes_pos[new.nodes.index(disk.n)]
+                           for disk in disk_elements]) / new.m
+    new.CG       = CG_sh + CG_dsk
+    new.Ip       = (np.sum([sh.Im for sh in new.shaft_elements])
+                    + np.sum([disk.Ip for disk in disk_elements]))
+
+    # transverse inertia about CG from a rigid rotation mode, as in ROSS
+    v = np.zeros(new.ndof)
+    nodes_pos_l = new.df_shaft["nodes_pos_l"].to_numpy()
+    nodes_pos_r = new.df_shaft["nodes_pos_r"].to_numpy()
+    for i, elm in enumerate(new.shaft_elements):
+        dofs    = list(elm.dof_global_index.values())
+        mapping = elm.dof_mapping()
+        v[dofs[mapping["y_0"]]]     = -(nodes_pos_l[i] - new.CG)
+        v[dofs[mapping["y_1"]]]     = -(nodes_pos_r[i] - new.CG)
+        v[dofs[mapping["alpha_0"]]] = 1
+        v[dofs[mapping["alpha_1"]]] = 1
+    new.It = v @ (new.M0 @ v)
+
+    return new
+
+def assemble_ross_rotor(data, cache=ross_cache,
+                        element_cache=shaft_element_cache):
+    """
+    Builds the ROSS rotor described by rotor_model_data(), reusing cached
+    models and shaft elements (see create_ross_rotor).
+    """
+    mesh = data["mesh"]
+    bearing_elements = ross_bearing_elements(data)
+    disk_elements    = ross_disk_elements(data)
+
+    key = None
+    if cache is not None:
+        key = (mesh.key(), data["material"])
+        model = cache.get(key)
+        if model is not None:
+            return replace_components(model, bearing_elements,
+                                      disk_elements)
+
+    material = ross_material(data["material"])
+    model = rs.Rotor(shaft_elements   = ross_shaft_elements(mesh, material,
+                                                            element_cache),
+                     bearing_elements = bearing_elements,
+                     disk_elements    = disk_elements)
+
+    if cache is not None:
+        # callers get a copy, so the cached model never carries their
+        # changes or memoized results
+        cache.put(key, model)
+        return replace_components(model, model.bearing_elements,
+                                  model.disk_elements)
+
+    return model
+
+def create_ross_rotor(rotor, element_dx, cache=ross_cache,
+                      element_cache=shaft_element_cache, mesh=None):
     """
     Acts as an interface between PyPump and ROSS, automating shaft
     discretization and placement of bearing and disk (mass) elements.
+
+    All layout data is in SI base units, so ROSS receives plain floats.
+    Assembled models are kept in cache (pass cache=None to always rebuild):
+    when only bearing coefficients or disk mass properties changed since
+    a previous call, only those elements are rebuilt.
+
+    Identical shaft elements are built once and share their matrices through
+    element_cache (pass element_cache=None to build every element).
+
+    A precomputed mesh (see analyses.mesh) may be given instead of
+    element_dx.
     """
-    #rotor_speed = rotor.impeller.design_point.omega
+    if mesh is None:
+        mesh = discretize_rotor(rotor, element_dx)
 
-    # set material
-    material = rs.Material(name    = rotor.shaft.material.name,
-                           rho     = rotor.shaft.material.rho,
-                           E       = rotor.shaft.material.e,
-                           Poisson = rotor.shaft.material.nu)
+    return assemble_ross_rotor(rotor_model_data(rotor, mesh), cache,
+                               element_cache)
 
-    # discretize_shaft
-    shaft_elements   = []
-    disk_elements    = []
-    bearing_elements = []
+def whirl_roots(model, speed, n_modes):
+    """
+    Eigenvalues of the first n_modes whirl modes of a ROSS rotor at speed
+    (see select_whirl_roots).
+    """
+    modal = model.run_modal(speed, num_modes=4*n_modes + 8)
+    return select_whirl_roots(modal.evalues, n_modes)
+
+def whirl_modes(model, speed, n_modes):
+    """
+    Whirl roots of a ROSS rotor as in whirl_roots, and their mode shapes
+    (ROSS DOFs), (ndof, n_modes).
+    """
+    modal = model.run_modal(speed, num_modes=4*n_modes + 8)
+    modes = whirl_root_indices(modal.evalues, n_modes)
+    return modal.evalues[modes], modal.evectors[:model.ndof, modes]
+
+def natural_frequencies(model, speed, n_modes):
+    """
+    First n_modes natural frequencies (rad/s) of a ROSS rotor at speed,
+    in ascending order (see whirl_roots).
+    """
+    return np.abs(whirl_roots(model, speed, n_modes))
+
+def create_ross_rotor_adaptive(rotor, tolerance=1e-3, n_modes=4, speed=0.0,
+                               growth=1.3, max_iterations=8,
+                               cache=ross_cache,
+                               element_cache=shaft_element_cache):
+    """
+    Builds a ROSS rotor on a graded mesh (see analyses.mesh.discretize_rotor)
+    refined near components and diameter steps, and coarse along
+    uniform spans. Starting from a coarse mesh, element sizes are halved
+    until the first n_modes natural frequencies at speed (rad/s) change by
+    less than tolerance (relative) between two successive meshes. Fewer
+    modes may be found (see select_whirl_roots); missing ones are nan, and
+    two meshes finding a different number of modes have not converged.
+
+    Returns the ROSS rotor and a report dict with the element count, the
+    estimated relative frequency error, the natural frequencies and the
+    number of refinement iterations.
+    """
+    speed = strip_units(speed, "angular_velocity")
+    dx_max = rotor.shaft.length / 8
+    element_dx = np.min(rotor.shaft.l) / 2
+
+    wn_previous = None
+    error = np.inf
+    for iteration in range(1, max_iterations + 1):
+        mesh = discretize_rotor(rotor, element_dx, dx_max=dx_max,
+                                growth=growth)
+        model = create_ross_rotor(rotor, None, cache=cache,
+                                  element_cache=element_cache, mesh=mesh)
+        roots = natural_frequencies(model, speed, n_modes)
+        wn = np.full(n_modes, np.nan)
+        wn[:len(roots)] = roots
+
+        if wn_previous is not None:
+            found = ~np.isnan(wn)
+            if np.array_equal(found, ~np.isnan(wn_previous)):
+                error = np.max(np.abs(wn[found] - wn_previous[found])
+                               / wn[found], initial=0.0)
+            else:
+                error = np.inf
+            if error < tolerance:
+                break
+
+        wn_previous = wn
+        element_dx  = element_dx / 2
+        dx_max      = dx_max / 2
+
+    report = {"n_elements":      mesh.n_elements,
+              "n_dof":           model.ndof,
+              "frequency_error": error,
+              "wn":              wn,
+              "iterations":      iteration,
+              "converged":       error < tolerance}
+
+    return model, report
+
+def reduction_master_nodes(mesh):
+    """
+    Master nodes of a reduced model: the shaft ends, the segment ends and
+    the bearing, seal and disk nodes, in ascending order.
+    """
+    nodes = {0, mesh.n_elements}
+    nodes.update(np.flatnonzero(np.diff(mesh.element_segment)) + 1)
+    for component_nodes in (mesh.bearing_nodes, mesh.seal_nodes,
+                            mesh.disk_nodes):
+        nodes.update(node for _, node in component_nodes)
+    return sorted(int(node) for node in nodes)
+
+class ReducedRotor:
+    """
+    Craig-Bampton reduction of an assembled ROSS rotor.
+
+    All DOFs of the master nodes are kept; the other (slave) DOFs follow
+    the masters through the static constraint modes of the shaft, plus
+    n_internal_modes fixed-interface normal modes (n_internal_modes=0 is a
+    Guyan reduction). Bearings and seals only connect master nodes, so the reduction
+    basis does not depend on speed and the bearing coefficients are added
+    to the reduced matrices as they are.
+    """
+    def __init__(self, model, master_nodes, n_internal_modes=8):
+        """
+        """
+        number_dof = model.number_dof
+        ndof = model.ndof
+        masters = np.concatenate([np.arange(number_dof*node,
+                                            number_dof*(node + 1))
+                                  for node in master_nodes])
+        slaves = np.setdiff1d(np.arange(ndof), masters)
+
+        K_ss = model.K0[np.ix_(slaves, slaves)]
+        M_ss = model.M0[np.ix_(slaves, slaves)]
+        K_sm = model.K0[np.ix_(slaves, masters)]
+
+        n_internal = min(n_internal_modes, len(slaves))
+        T = np.zeros((ndof, len(masters) + n_internal))
+        T[masters, np.arange(len(masters))] = 1.0
+        T[slaves, :len(masters)] = -la.solve(K_ss, K_sm, assume_a="sym")
+        if n_internal > 0:
+            _, modes = la.eigh(K_ss, M_ss, subset_by_index=(0, n_internal-1))
+            T[slaves, len(masters):] = modes
+
+        self.model        = model
+        self.master_nodes = list(master_nodes)
+        self.masters      = masters
+        self.T            = T
+        self.ndof         = T.shape[1]
+        self.M0 = T.T @ model.M0 @ T
+        self.K0 = T.T @ model.K0 @ T
+        self.C0 = T.T @ model.C0 @ T
+        self.G0 = T.T @ model.G0 @ T
+
+        position = {dof: i for i, dof in enumerate(masters)}
+        self.bearing_dofs = []
+        for elm in model.bearing_elements:
+            dofs = [position[dof] for dof in elm.dof_global_index.values()]
+            self.bearing_dofs.append((elm, np.ix_(dofs, dofs)))
+
+    def M(self, frequency=0.0):
+        M = self.M0.copy()
+        for elm, dofs in self.bearing_dofs:
+            M[dofs] += elm.M(frequency)
+        return M
+
+    def K(self, frequency):
+        K = self.K0.copy()
+        for elm, dofs in self.bearing_dofs:
+            K[dofs] += elm.K(frequency)
+        return K
+
+    def C(self, frequency):
+        C = self.C0.copy()
+        for elm, dofs in self.bearing_dofs:
+            C[dofs] += elm.C(frequency)
+        return C
+
+    def G(self):
+        return self.G0
+
+    def dynamic_stiffness(self, speeds):
+        """
+        Synchronous dynamic stiffness K - speed**2 M + 1j speed (C + speed G)
+        at each speed (rad/s), (len(speeds), ndof, ndof). The bearing and
+        seal coefficients are interpolated for all speeds in one call each.
+        """
+        speeds = np.asarray(speeds, dtype=float)
+        w = speeds[:, None, None]
+        Z = self.K0 - w**2 * self.M0 + 1j * w * (self.C0 + w * self.G0)
+        for elm, dofs in self.bearing_dofs:
+            coefficients = np.zeros((len(speeds), 3, 3), dtype=complex)
+            for i, j, name in ((0, 0, "xx"), (0, 1, "xy"), (1, 0, "yx"),
+                               (1, 1, "yy"), (2, 2, "zz")):
+                k, c, m = [getattr(elm, kind + name + "_interpolated")(speeds)
+                           for kind in ("k", "c", "m")]
+                coefficients[:, i, j] = k - speeds**2 * m + 1j * speeds * c
+            Z[(slice(None),) + dofs] += coefficients
+        return Z
+
+    def A(self, speed):
+        """
+        State space matrix at speed (rad/s), as in ROSS.
+        """
+        M = self.M(speed)
+        Z = np.zeros_like(M)
+        I = np.eye(self.ndof)
+        return np.block([[Z, I],
+                         [la.solve(-M, self.K(speed)),
+                          la.solve(-M, self.C(speed) + self.G0 * speed)]])
+
+    def whirl_roots(self, speed, n_modes):
+        """
+        Eigenvalues of the first n_modes whirl modes at speed (see
+        select_whirl_roots).
+        """
+        return select_whirl_roots(la.eigvals(self.A(speed)), n_modes)
+
+    def whirl_modes(self, speed, n_modes):
+        """
+        Whirl roots as in whirl_roots, and their mode shapes in reduced
+        coordinates, (ndof, n_modes).
+        """
+        evalues, evectors = la.eig(self.A(speed))
+        modes = whirl_root_indices(evalues, n_modes)
+        return evalues[modes], evectors[:self.ndof, modes]
+
+    def natural_frequencies(self, speed, n_modes):
+        return np.abs(self.whirl_roots(speed, n_modes))
+
+    def expand(self, q):
+        """
+        Full-model DOFs (ROSS ordering) from reduced coordinates.
+        """
+        return self.T @ q
+
+def create_reduced_rotor(rotor, element_dx, n_internal_modes=8,
+                         n_check_modes=4, check_speed=0.0, mesh=None,
+                         cache=ross_cache, element_cache=shaft_element_cache):
+    """
+    Builds the ROSS rotor (see create_ross_rotor) and its ReducedRotor, with
+    master nodes at the shaft and segment ends, bearings, seals and disks.
+
+    The first n_check_modes natural frequencies at check_speed are compared
+    with the full model (n_check_modes=0 skips the check). Returns the
+    reduced rotor and a report dict with the full and reduced DOF counts,
+    both sets of natural frequencies and the largest relative error.
+    """
+    if mesh is None:
+        mesh = discretize_rotor(rotor, element_dx)
+    model = create_ross_rotor(rotor, None, cache=cache,
+                              element_cache=element_cache, mesh=mesh)
+    reduced = ReducedRotor(model, reduction_master_nodes(mesh),
+                           n_internal_modes)
+
+    report = {"n_dof":         model.ndof,
+              "n_dof_reduced": reduced.ndof}
+    if n_check_modes > 0:
+        check_speed = strip_units(check_speed, "angular_velocity")
+        wn      = natural_frequencies(model, check_speed, n_check_modes)
+        wn_rom  = reduced.natural_frequencies(check_speed, n_check_modes)
+        n = min(len(wn), len(wn_rom))
+        report["wn"]              = wn
+        report["wn_reduced"]      = wn_rom
+        report["frequency_error"] = np.max(np.abs(wn_rom[:n] - wn[:n])
+                                           / wn[:n], initial=0.0)
+
+    return reduced, report
+
+def unbalance_response(model, speeds, unbalance_nodes, unbalance,
+                       phase=0.0, probe_nodes=(), block_size=256):
+    """
+    Steady-state unbalance response of a ROSS or reduced rotor at each
+    speed (rad/s): unbalance (kg.m) at unbalance_nodes, with phase (rad),
+    as forces unbalance speed**2 (1, -1j) exp(1j phase) on x and y.
+
+    The dynamic stiffness of a ReducedRotor (see
+    ReducedRotor.dynamic_stiffness) is small, so blocks of block_size speeds
+    are solved with one stacked LU solve, and only the probe DOFs are
+    expanded back. On a full ROSS rotor, each speed is solved on its own.
+
+    Returns the complex x and y displacements (m) at probe_nodes,
+    (len(speeds), len(probe_nodes), 2).
+    """
+    speeds = np.atleast_1d(np.asarray(speeds, dtype=float))
+    unbalance_nodes = np.atleast_1d(unbalance_nodes)
+    unbalance, phase = np.broadcast_arrays(
+            np.asarray(unbalance, dtype=float),
+            np.asarray(strip_units(phase, "angle"), dtype=float))
+    unbalance = np.broadcast_to(unbalance, unbalance_nodes.shape)
+    phase     = np.broadcast_to(phase, unbalance_nodes.shape)
+
+    reduced = isinstance(model, ReducedRotor)
+    full    = model.model if reduced else model
+    n       = full.number_dof
+
+    # unbalance force per unit speed**2, full DOFs
+    b = np.zeros(full.ndof, dtype=complex)
+    for node, magnitude, angle in zip(unbalance_nodes, unbalance, phase):
+        b[n*node]     += magnitude * np.exp(1j*angle)
+        b[n*node + 1] += -1j * magnitude * np.exp(1j*angle)
+    probe = np.array([[n*node, n*node + 1] for node in probe_nodes],
+                     dtype=int).reshape(-1, 2)
+    if reduced:
+        b = model.T.T @ b
+        expand = model.T[probe.ravel()]
+
+    response = np.zeros((len(speeds), len(probe), 2), dtype=complex)
+    for start in range(0, len(speeds), block_size):
+        block = speeds[start:start + block_size]
+        if reduced:
+            Z = model.dynamic_stiffness(block)
+            q = np.linalg.solve(Z, (block[:, None]**2 * b)[..., None])
+            q = (expand @ q)[..., 0]
+        else:
+            q = np.stack([la.solve(model.K(speed) - speed**2 * model.M(speed)
+                                   + 1j * speed * (model.C(speed)
+                                                   + speed * model.G()),
+                                   speed**2 * b)[probe.ravel()]
+                          for speed in block])
+        response[start:start + len(block)] = q.reshape(len(block), -1, 2)
+    return response
+
+def forced_response(rotor, speeds, element_dx, unbalance=None, phase=0.0,
+                    balance_grade=2.5, n_internal_modes=8, mesh=None):
+    """
+    Unbalance response sweep of a Rotor at its bearings and seals, on the
+    ReducedRotor of its ROSS model (see unbalance_response).
+
+    unbalance (kg.m, one value or one per impeller) sits at the impeller
+    nodes with phase (rad); by default each impeller carries the residual
+    unbalance of ISO 1940 balance_grade (mm/s) at the design speed,
+    impeller mass * balance_grade / design speed.
+
+    Returns a structured array with one row per speed and fields:
+
+        speed              rotor speed (rad/s)
+        bearing_amplitude  x and y amplitudes (m), (n_bearings, 2)
+        bearing_phase      x and y phases (rad), (n_bearings, 2)
+        seal_amplitude     x and y amplitudes (m), (n_seals, 2)
+        seal_phase         x and y phases (rad), (n_seals, 2)
+
+    bearings and seals in rotor.bearings and rotor.seals order.
+    """
+    element_dx = strip_units(element_dx, "length")
+    speeds = np.atleast_1d(np.asarray(strip_units(speeds, "angular_velocity"),
+                                      dtype=float))
+    if mesh is None:
+        mesh = discretize_rotor(rotor, element_dx)
+    impellers = [(index, node) for index, node in mesh.disk_nodes
+                 if rotor.disks[index]["kind"] == "impeller"]
+    if unbalance is None:
+        unbalance = [rotor.disks[index]["mass"] * balance_grade * 1e-3
+                     / rotor.disks[index]["impeller"].design_point.si["omega"]
+                     for index, _ in impellers]
+
+    model = create_ross_rotor(rotor, None, mesh=mesh)
+    if n_internal_modes is not None:
+        model = ReducedRotor(model, reduction_master_nodes(mesh),
+                             n_internal_modes)
+
+    probes = mesh.bearing_nodes + mesh.seal_nodes
+    response = unbalance_response(model, speeds,
+                                  [node for _, node in impellers],
+                                  unbalance, phase,
+                                  [node for _, node in probes])
+
+    n_bearings, n_seals = len(rotor.bearings), len(rotor.seals)
+    table = np.zeros(len(speeds), dtype=[
+            ("speed",             float),
+            ("bearing_amplitude", float, (n_bearings, 2)),
+            ("bearing_phase",     float, (n_bearings, 2)),
+            ("seal_amplitude",    float, (n_seals, 2)),
+            ("seal_phase",        float, (n_seals, 2))])
+    table["speed"] = speeds
+    n_probes = len(mesh.bearing_nodes)
+    for kind, nodes, values in (("bearing", mesh.bearing_nodes,
+                                 response[:, :n_probes]),
+                                ("seal", mesh.seal_nodes,
+                                 response[:, n_probes:])):
+        order = [index for index, _ in nodes]
+        table[kind + "_amplitude"][:, order] = np.abs(values)
+        table[kind + "_phase"][:, order]     = np.angle(values)
+    return table
+
+def campbell(model, speeds, n_modes):
+    """
+    Damped natural frequencies (rad/s) of the first n_modes whirl modes of a
+    ROSS, reduced or beam (analyses.beam.BeamRotor) rotor at speeds[0],
+    tracked over speeds (rad/s, see track_whirl_modes): a (len(speeds),
+    n_modes) array, nan where a mode was not found.
+    """
+    if hasattr(model, "whirl_modes"):
+        return track_whirl_modes(model.whirl_modes, speeds, n_modes)
+    return track_whirl_modes(lambda speed, n: whirl_modes(model, speed, n),
+                             speeds, n_modes)
+
+def campbell_task(task):
+    """
+    Process pool worker: campbell() of one rotor_model_data() description,
+    on the full model or, with n_internal_modes, on its ReducedRotor. Each
+    worker process keeps its own model and shaft element caches.
+    """
+    data, speeds, n_modes, n_internal_modes = task
+    model = assemble_ross_rotor(data)
+    if n_internal_modes is not None:
+        model = ReducedRotor(model, reduction_master_nodes(data["mesh"]),
+                             n_internal_modes)
+    return campbell(model, speeds, n_modes)
+
+def critical_speed_sweep(rotors, speeds, element_dx, n_modes=4,
+                         relative_speeds=False, n_internal_modes=None,
+                         max_workers=None, chunksize=None):
+    """
+    Campbell diagrams and critical speeds of a list of rotor variants.
+
+    Each rotor is discretized here and handed to the worker processes as a
+    picklable rotor_model_data() description; workers build and solve the
+    ROSS models over the speed grid. Variants are scheduled in chunks,
+    grouped by mesh so the workers' model caches only swap bearings and
+    disks between consecutive variants. max_workers=1 runs in-process.
+
+    speeds (rad/s) is shared by all variants, or with relative_speeds a grid
+    of fractions of each rotor's design speed (DesignPoint.omega).
+
+    With n_internal_modes, the sweeps are solved on reduced models (see
+    ReducedRotor and create_reduced_rotor for an accuracy check).
+
+    Returns a structured array with one row per rotor and fields:
+
+        design_speed     design speed (rad/s)
+        speeds           speed grid (rad/s), (n_speeds,)
+        wd               damped natural frequencies (rad/s), (n_speeds, n_modes)
+        critical_speeds  synchronous crossing of each mode (rad/s), (n_modes,)
+        margins          (critical speed - design speed) / design speed
+        min_margin       smallest absolute margin (inf without critical speed)
+    """
+    element_dx = strip_units(element_dx, "length")
+    speeds = np.asarray(strip_units(speeds, "angular_velocity"), dtype=float)
+    n_speeds = len(speeds)
+
+    design_speed = np.array([rotor.impeller["impeller"].design_point.si["omega"]
+                             if rotor.impeller is not None else np.nan
+                             for rotor in rotors])
+    if relative_speeds:
+        grid = design_speed[:, None] * speeds
+    else:
+        grid = np.broadcast_to(speeds, (len(rotors), n_speeds))
+
+    # bearing coefficients are tabulated on each rotor's own speed grid
+    data = [rotor_model_data(rotor, discretize_rotor(rotor, element_dx),
+                             grid[i])
+            for i, rotor in enumerate(rotors)]
+
+    order = sorted(range(len(data)), key=lambda i: data[i]["mesh"].key())
+    tasks = [(data[i], grid[i], n_modes, n_internal_modes) for i in order]
+    if max_workers == 1:
+        results = list(map(campbell_task, tasks))
+    else:
+        if chunksize is None:
+            workers = max_workers or os.cpu_count() or 1
+            chunksize = max(1, len(tasks) // (4 * workers))
+        with ProcessPoolExecutor(max_workers,
+                                 initializer=init_worker) as pool:
+            results = list(pool.map(campbell_task, tasks,
+                                    chunksize=chunksize))
+
+    table = np.zeros(len(data), dtype=[
+            ("design_speed",    float),
+            ("speeds",          float, (n_speeds,)),
+            ("wd",              float, (n_speeds, n_modes)),
+            ("critical_speeds", float, (n_modes,)),
+            ("margins",         float, (n_modes,)),
+            ("min_margin",      float)])
+    table["design_speed"] = design_speed
+    table["speeds"]       = grid
+    table["wd"][order]    = results
 
-    node_id = 0
-    for i in range(len(rotor.shaft.segments)):
-        segment = rotor.shaft.segments[i]
-        x_left  = segment["x0"]
-        x_right = segment["x0"] + segment["l"]
-        special_nodes = []
-        for j in range(len(rotor.bearings)):
-            bearing = rotor.bearings[j]
-            if (x_left < bearing["xc"] < x_right):
-                bearing_x = bearing["xc"] - segment["x0"]
-                special_nodes.append({"x":     bearing_x,
-                                      "index": j,
-                                      "kind":  "bearing"})
-
-        if (x_left < rotor.impeller["xc"] < x_right):
-            mass_x = rotor.impeller["xc"] - segment["x0"]
-            special_nodes.append({"x":     mass_x,
-                                  "index": None,
-                                  "kind":  "impeller"})
-        
-        # sort nodes by ascending x location to build subsegments
-        special_nodes.sort(key=itemgetter("x"))
-
-        special_nodes.append({"x":     x_right - x_left,
-                              "index": None,
-                              "kind":  "segment_end"})
-
-        x_ref = 0
-        for node in special_nodes:
-            sub_length     = node["x"] - x_ref
-            x_ref          = node["x"]
-            length_ratio   = (sub_length / element_dx)
-            length_ratio   = length_ratio.to("dimensionless")
-            n_elements     = int(np.ceil(length_ratio))
-            element_length = sub_length / n_elements
-
-            for i in range(n_elements):
-                shaft_elements.append(
-                        rs.ShaftElement(
-                            L              = element_length,
-                            idl            = 0.0,
-                            odl            = segment["d"],
-                            material       = material,
-                            shear_effects  = True,
-                            rotary_inertia = True,
-                            gyroscopic     = True
-                            )
-                        )
-
-            node_id += n_elements
-            
-            if node["kind"] == "bearing":
-                bearing = rotor.bearings[node["index"]]["model"]
-                bearing_elements.append(
-                        rs.BearingElement(
-                            n         = node_id,
-                            kxx       = bearing.kxx,
-                            kyy       = bearing.kyy,
-                            cxx       = bearing.cxx,
-                            frequency = bearing.frequency
-                            )
-                        )
-
-            if node["kind"] == "impeller":
-                disk_elements.append(
-                        rs.DiskElement(
-                            n   = node_id,
-                            m   = rotor.impeller["mass"],
-                            Ip  = rotor.impeller["polar_inertia"],
-                            Id  = rotor.impeller["diametral_inertia"],
-                            tag = "Disk"
-                            )
-                        )
-
-    return rs.Rotor(shaft_elements   = shaft_elements,
-                    bearing_elements = bearing_elements,
-                    disk_elements    = disk_elements)
+    table["critical_speeds"] = synchronous_crossings(table["speeds"],
+                                                     table["wd"])
+    table["margins"] = ((table["critical_speeds"] - design_speed[:, None])
+                        / design_speed[:, None])
+    table["min_margin"] = np.min(np.abs(np.nan_to_num(table["margins"],
+                                                      nan=np.inf)), axis=-1)
 
+    return table
@@ -0,0 +1,255 @@
+"""
+Static analysis of a rotor on its bearings: shaft deflection, bending
+stress and bearing reactions under gravity, impeller hydraulic loads and
+unbalance, for many load cases at once. Built on the beam model of
+analyses.beam (no ROSS), all values in SI base units.
+"""
+
+import numpy as np
+import scipy.sparse.linalg as spla
+
+from .. import strip_units, g_n
+from .beam import BeamRotor, element_matrices, number_dof, plane_y, flip
+from .mesh import discretize_rotor, rotor_model_data
+
+def radial_thrust(impeller, flow_ratio=1.0, k0=0.36):
+    """
+    Radial hydraulic load (N) of an impeller in a volute at flow_ratio
+    (Q / Q design), after Stepanoff: k0 (1 - flow_ratio**2) rho g H d2 b2.
+    Approximate, zero at the design flow.
+    """
+    si  = impeller.si
+    rho = impeller.design_point.fluid.si["rho"]
+    k   = k0 * (1 - np.asarray(flow_ratio, dtype=float)**2)
+    return np.abs(k) * rho * g_n * si["h"] * si["d2"] * si["b2"]
+
+def case_count(*loads):
+    """
+    Number of load cases: the first dimension of the array loads.
+    """
+    return max([np.shape(load)[0] for load in loads if np.ndim(load) > 0],
+               default=1)
+
+def per_impeller(load, n_cases, n_impellers, name):
+    """
+    Impeller load broadcast to (n_cases, n_impellers). A 1-D array is per
+    case, which is ambiguous with several impellers: those need a scalar
+    or a 2-D array.
+    """
+    load = np.asarray(load, dtype=float)
+    if load.ndim == 1:
+        if n_impellers > 1 and load.size > 1:
+            raise ValueError(name + " of a rotor with several impellers " + \
+                             "must be a scalar or a (n_cases, n_impellers) " + \
+                             "array.")
+        load = load[:, None]
+    return np.broadcast_to(load, (n_cases, n_impellers))
+
+class StaticSolution:
+    """
+    Results of StaticRotor.solve, for n_cases load cases:
+
+        nodes_x            node positions (m), (n_nodes,)
+        deflection         x and y displacements (m), (n_cases, n_nodes, 2)
+        bending_moment     resultant bending moment at the element ends
+                           (N.m), (n_cases, n_elements, 2)
+        stress             largest bending stress of each element (Pa),
+                           (n_cases, n_elements)
+        bearing_reactions  x and y bearing forces on the shaft (N),
+                           (n_cases, n_bearings, 2), bearings in
+                           rotor.bearings order
+        bearing_radial     radial bearing loads (N), (n_cases, n_bearings)
+        bearing_axial      axial bearing loads (N), (n_cases, n_bearings)
+        seal_reactions     x and y seal forces on the shaft (N),
+                           (n_cases, n_seals, 2), seals in rotor.seals order
+                           (zero for seals without coefficients)
+    """
+    def __init__(self, rotor, nodes_x, deflection, bending_moment, stress,
+                 bearing_reactions, bearing_axial, seal_reactions):
+        """
+        """
+        self.rotor             = rotor
+        self.nodes_x           = nodes_x
+        self.deflection        = deflection
+        self.bending_moment    = bending_moment
+        self.stress            = stress
+        self.bearing_reactions = bearing_reactions
+        self.bearing_radial    = np.hypot(bearing_reactions[..., 0],
+                                          bearing_reactions[..., 1])
+        self.bearing_axial     = bearing_axial
+        self.seal_reactions    = seal_reactions
+
+    def equivalent_dynamic_loads(self):
+        """
+        Equivalent dynamic loads P (N) of the bearings whose model provides
+        equivalentDynamicLoads (BearingAdvanced): a dict from bearing index
+        (in rotor.bearings) to a (n_cases,) array.
+        """
+        loads = dict()
+        for i, layout in enumerate(self.rotor.bearings):
+            model = layout["model"]
+            if getattr(model, "table", None) is None or \
+               not hasattr(model, "equivalentDynamicLoads"):
+                continue
+            loads[i] = model.equivalentDynamicLoads(
+                    self.bearing_axial[:, i], self.bearing_radial[:, i])[0]
+        return loads
+
+class StaticRotor:
+    """
+    Static beam model of a Rotor, supported by its bearing (and seal)
+    stiffness at speed. The stiffness matrix is factorized once; every call
+    to solve then handles any number of load cases with one
+    back-substitution.
+    """
+    def __init__(self, rotor, element_dx, speed=None, mesh=None):
+        """
+        speed (rad/s) selects the bearing coefficients and sets the
+        unbalance forces; it defaults to the impeller design speed.
+        """
+        if mesh is None:
+            mesh = discretize_rotor(rotor, element_dx)
+        if speed is None:
+            speed = rotor.impeller["impeller"].design_point.si["omega"]
+        self.rotor = rotor
+        self.mesh  = mesh
+        self.speed = strip_units(speed, "angular_velocity")
+        data       = rotor_model_data(rotor, mesh, [self.speed])
+        self.model = BeamRotor(data)
+        self.lu    = spla.splu(self.model.K(self.speed))
+
+        _, rho, e, nu = data["material"]
+        self.rho = rho
+        self.element_stiffness = element_matrices(mesh.element_length,
+                                                  mesh.element_diameter,
+                                                  rho, e, nu)[1]
+        self.element_dofs = number_dof * np.arange(mesh.n_elements)[:, None] \
+                            + np.arange(2 * number_dof)
+
+        self.impeller_nodes = [node for index, node in mesh.disk_nodes
+                               if rotor.disks[index]["kind"] == "impeller"]
+        self.bearing_nodes = mesh.bearing_nodes
+        self.seal_nodes    = [(index, node) for index, node in mesh.seal_nodes
+                              if rotor.seals[index]["model"].coefficients
+                              is not None]
+
+    def element_loads(self, gravity):
+        """
+        Consistent element load vectors of the shaft weight, (n_cases,
+        n_elements, 8), gravity along -y.
+        """
+        mesh = self.mesh
+        L = mesh.element_length
+        w = -self.rho * np.pi/4 * mesh.element_diameter**2 * g_n
+        plane = np.stack((L/2, L**2/12, L/2, -L**2/12), axis=-1) * w[:, None]
+        loads = np.zeros((mesh.n_elements, 8))
+        loads[:, plane_y] = flip * plane
+        return gravity[:, None, None] * loads
+
+    def load_vectors(self, gravity=1.0, radial_load=0.0, radial_angle=0.0,
+                     unbalance=0.0, unbalance_phase=0.0, n_cases=None):
+        """
+        Global load vectors (ndof, n_cases) and element loads (see
+        element_loads). gravity scales g (0 for none); radial_load (N) acts
+        on each impeller at radial_angle (rad, from x towards y); unbalance
+        (kg.m) gives a force unbalance speed**2 at unbalance_phase (rad).
+
+        Arguments are scalars, per case arrays (n_cases,) or, for the
+        impeller loads, (n_cases, n_impellers) arrays; with several
+        impellers, impeller loads must be scalars or 2-D arrays (see
+        per_impeller).
+        """
+        radial_load     = strip_units(radial_load, "force")
+        radial_angle    = strip_units(radial_angle, "angle")
+        unbalance_phase = strip_units(unbalance_phase, "angle")
+        if n_cases is None:
+            n_cases = case_count(gravity, radial_load, radial_angle,
+                                 unbalance, unbalance_phase)
+        n_impellers = len(self.impeller_nodes)
+
+        gravity = np.broadcast_to(np.asarray(gravity, dtype=float),
+                                  (n_cases,))
+        radial_load, radial_angle, unbalance, unbalance_phase = [
+                per_impeller(load, n_cases, n_impellers, name)
+                for load, name in ((radial_load, "radial_load"),
+                                   (radial_angle, "radial_angle"),
+                                   (unbalance, "unbalance"),
+                                   (unbalance_phase, "unbalance_phase"))]
+
+        element_loads = self.element_loads(gravity)
+        F = np.zeros((self.model.ndof, n_cases))
+        np.add.at(F, self.element_dofs, element_loads.transpose(1, 2, 0))
+
+        for index, node in self.mesh.disk_nodes:
+            F[number_dof*node + 1] -= gravity * \
+                                      self.rotor.disks[index]["mass"] * g_n
+
+        unbalance_force = unbalance * self.speed**2
+        for k, node in enumerate(self.impeller_nodes):
+            F[number_dof*node] += \
+                radial_load[:, k] * np.cos(radial_angle[:, k]) + \
+                unbalance_force[:, k] * np.cos(unbalance_phase[:, k])
+            F[number_dof*node + 1] += \
+                radial_load[:, k] * np.sin(radial_angle[:, k]) + \
+                unbalance_force[:, k] * np.sin(unbalance_phase[:, k])
+
+        return F, element_loads
+
+    def solve(self, gravity=1.0, radial_load=0.0, radial_angle=0.0,
+              axial_load=0.0, unbalance=0.0, unbalance_phase=0.0,
+              thrust_bearing=0):
+        """
+        Solves all load cases (see load_vectors) and returns a
+        StaticSolution. axial_load (N, per impeller) is carried by the
+        bearing thrust_bearing (index in rotor.bearings), on top of each
+        bearing's own axial load (preload). Bending stresses leave out the
+        axial stress.
+        """
+        axial_load = np.asarray(strip_units(axial_load, "force"),
+                                dtype=float)
+        n_cases = case_count(gravity, radial_load, radial_angle, axial_load,
+                             unbalance, unbalance_phase)
+        F, element_loads = self.load_vectors(gravity, radial_load,
+                                             radial_angle, unbalance,
+                                             unbalance_phase, n_cases)
+        u = self.lu.solve(F)
+
+        mesh = self.mesh
+        nodes = number_dof * np.arange(mesh.n_nodes)
+        deflection = np.stack((u[nodes], u[nodes + 1]), axis=-1)
+        deflection = deflection.transpose(1, 0, 2)
+
+        # element end forces, rotational DOFs (alpha, beta) at both ends
+        u_elements = u[self.element_dofs].transpose(2, 0, 1)
+        end_forces = np.einsum("eij,cej->cei", self.element_stiffness,
+                               u_elements) - element_loads
+        moment = np.stack((np.hypot(end_forces[..., 2], end_forces[..., 3]),
+                           np.hypot(end_forces[..., 6], end_forces[..., 7])),
+                          axis=-1)
+        section_modulus = np.pi * mesh.element_diameter**3 / 32
+        stress = moment.max(axis=-1) / section_modulus
+
+        # bearing and seal forces on the shaft, -k u at their nodes
+        supports = self.model.bearings
+        n_bearings = len(self.bearing_nodes)
+        def reactions(components, supports, n_components):
+            forces = np.zeros((n_cases, n_components, 2))
+            for (index, node), support in zip(components, supports):
+                forces[:, index, 0] = -support["kxx"][0] * u[number_dof*node]
+                forces[:, index, 1] = -support["kyy"][0] * \
+                                      u[number_dof*node + 1]
+            return forces
+        bearing_forces = reactions(self.bearing_nodes, supports[:n_bearings],
+                                   len(self.rotor.bearings))
+        seal_forces = reactions(self.seal_nodes, supports[n_bearings:],
+                                len(self.rotor.seals))
+
+        axial_load = per_impeller(axial_load, n_cases,
+                                  len(self.impeller_nodes),
+                                  "axial_load").sum(axis=-1)
+        axial = np.zeros((n_cases, len(self.rotor.bearings)))
+        axial += [layout["axial_load"] for layout in self.rotor.bearings]
+        axial[:, thrust_bearing] += np.abs(axial_load)
+
+        return StaticSolution(self.rotor, mesh.nodes_x, deflection, moment,
+                              stress, bearing_forces, axial, seal_forces)
@@ -0,0 +1,434 @@
+"""
+Tolerance and uncertainty propagation: manufacturing tolerances and catalog
+scatter (shaft segment diameters, impeller sizing inputs and mass, bearing
+and seal coefficients) are sampled by Monte Carlo or Latin hypercube, the
+impellers of each chunk of samples are sized at once with
+ImpellerBarskeBatch, and every sample is solved on the beam rotor model of
+analyses.beam (or on a ReducedRotor). Chunks run in worker processes and are
+folded into running statistics as they complete, so samples are never kept.
+All values in SI base units.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.stats import qmc
+
+from .. import init_worker, strip_units
+from ..parts.impeller import ImpellerBarskeBatch
+from .beam import BeamRotor, synchronous_crossings
+from .mesh import ShaftMesh, discretize_rotor, rotor_model_data
+
+# ImpellerBarske inputs that tolerances may scale, as "impeller_<name>"
+sizing_inputs = ("d0", "dh", "l", "phi", "psi", "kb1", "kb2")
+
+class RunningStatistics:
+    """
+    Streaming statistics of an output with a fixed shape per sample: mean,
+    standard deviation, extrema and percentiles, updated chunk by chunk
+    (means and variances are merged with Chan's parallel update).
+    Non-finite values (no critical speed on the speed grid) are counted
+    apart and left out.
+
+    Percentiles come from a histogram of n_bins bins per output component,
+    laid over the range of the first finite values of that component
+    widened by their span on each side. When later values fall outside it,
+    the range is doubled (pairs of bins merged) until they fit, so no value
+    is clipped; the resolution is then coarser.
+    """
+    def __init__(self, n_bins=1024):
+        """
+        n_bins must be even, for the bins to merge in pairs.
+        """
+        if n_bins < 2 or n_bins % 2:
+            raise ValueError("n_bins must be a positive even number.")
+        self.n_bins    = n_bins
+        self.count     = 0
+        self.shape     = None
+        self.n         = None
+        self._mean     = None
+        self._m2       = None
+        self.minimum   = None
+        self.maximum   = None
+        self.low       = None
+        self.width     = None
+        self.histogram = None
+
+    def update(self, values):
+        """
+        Adds a chunk of samples, an array of shape (n_samples,) + shape.
+        """
+        values = np.asarray(values, dtype=float)
+        if self.shape is None:
+            self.shape     = values.shape[1:]
+            n_components   = int(np.prod(self.shape))
+            self.n         = np.zeros(n_components, dtype=int)
+            self._mean     = np.zeros(n_components)
+            self._m2       = np.zeros(n_components)
+            self.minimum   = np.full(n_components, np.inf)
+            self.maximum   = np.full(n_components, -np.inf)
+            self.low       = np.full(n_components, np.nan)
+            self.width     = np.full(n_components, np.nan)
+            self.histogram = np.zeros((self.n_bins, n_components), dtype=int)
+        values = values.reshape(len(values), -1)
+        finite = np.isfinite(values)
+        self.count += len(values)
+
+        n_chunk = finite.sum(axis=0)
+        total   = self.n + n_chunk
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_chunk = np.where(finite, values, 0.0).sum(axis=0) / n_chunk
+            weight     = np.where(total > 0, n_chunk / total, 0.0)
+        m2_chunk = (np.where(finite, values - mean_chunk, 0.0)**2).sum(axis=0)
+        delta    = np.where(n_chunk > 0, mean_chunk - self._mean, 0.0)
+        self._mean = self._mean + delta * weight
+        self._m2   = self._m2 + np.where(n_chunk > 0, m2_chunk, 0.0) \
+                     + delta**2 * self.n * weight
+        self.n     = total
+        self.minimum = np.fmin(self.minimum, np.min(
+                np.where(finite, values, np.inf), axis=0))
+        self.maximum = np.fmax(self.maximum, np.max(
+                np.where(finite, values, -np.inf), axis=0))
+
+        # histogram range from the first finite values of each component
+        new = (n_chunk > 0) & np.isnan(self.low)
+        if np.any(new):
+            span = self.maximum[new] - self.minimum[new]
+            span = np.where(span > 0, span,
+                            np.maximum(np.abs(self.minimum[new]), 1.0) * 1e-3)
+            self.low[new]   = self.minimum[new] - span
+            self.width[new] = 3 * span / self.n_bins
+        for i in np.flatnonzero(n_chunk > 0):
+            self.extend(i, self.minimum[i], self.maximum[i])
+
+        with np.errstate(invalid="ignore"):
+            bins = np.floor((values - self.low) / self.width)
+        bins = np.clip(np.nan_to_num(bins), 0, self.n_bins - 1)
+        rows, columns = np.nonzero(finite)
+        np.add.at(self.histogram,
+                  (bins[rows, columns].astype(int), columns), 1)
+
+    def extend(self, i, low, high):
+        """
+        Doubles the histogram range of component i, merging its bins in
+        pairs, until it covers [low, high].
+        """
+        half = self.n_bins // 2
+        while True:
+            top = self.low[i] + self.n_bins * self.width[i]
+            if low >= self.low[i] and high <= top:
+                return
+            merged = self.histogram[0::2, i] + self.histogram[1::2, i]
+            self.histogram[:, i] = 0
+            if low < self.low[i]:
+                # grow downwards: the current range becomes the upper half
+                self.histogram[half:, i] = merged
+                self.low[i] -= self.n_bins * self.width[i]
+            else:
+                self.histogram[:half, i] = merged
+            self.width[i] *= 2
+
+    @property
+    def edges(self):
+        """
+        Histogram bin edges, (n_bins + 1, n_components).
+        """
+        return self.low + np.arange(self.n_bins + 1)[:, None] * self.width
+
+    @property
+    def mean(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.n > 0, self._mean,
+                            np.nan).reshape(self.shape)
+
+    @property
+    def std(self):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.n > 1, np.sqrt(self._m2 / (self.n - 1)),
+                            np.nan).reshape(self.shape)
+
+    @property
+    def finite_fraction(self):
+        """
+        Fraction of the samples with a finite value.
+        """
+        return (self.n / max(self.count, 1)).reshape(self.shape)
+
+    def percentile(self, q):
+        """
+        Percentiles q (0 to 100) of the finite values, interpolated in the
+        histogram: an array of shape np.shape(q) + shape.
+        """
+        q = np.asarray(q, dtype=float)
+        result = np.full(q.shape + (len(self.n),), np.nan)
+        for i in np.flatnonzero(self.n > 0):
+            cdf = np.concatenate(([0], np.cumsum(self.histogram[:, i])))
+            result[..., i] = np.interp(q / 100 * self.n[i], cdf,
+                                       self.edges[:, i])
+        return result.reshape(q.shape + self.shape)
+
+class ToleranceStatistics:
+    """
+    Results of propagate_tolerances:
+
+        n_samples        number of samples
+        statistics       dict of RunningStatistics of the sample outputs:
+                         critical_speeds (rad/s, (n_modes,)), margins
+                         ((n_modes,), see critical_speed_sweep), min_margin
+                         and impeller_mass (kg, (n_impellers,))
+        required_margin  smallest acceptable critical speed margin
+        violations       samples whose min_margin is below required_margin
+        elapsed          wall time (s)
+    """
+    def __init__(self, statistics, required_margin, violations, elapsed):
+        """
+        """
+        self.statistics      = statistics
+        self.n_samples       = statistics["min_margin"].count
+        self.required_margin = required_margin
+        self.violations      = violations
+        self.elapsed         = elapsed
+
+    @property
+    def violation_probability(self):
+        return self.violations / max(self.n_samples, 1)
+
+    @property
+    def violation_standard_error(self):
+        """
+        Binomial standard error of violation_probability.
+        """
+        p = self.violation_probability
+        return np.sqrt(p * (1 - p) / max(self.n_samples, 1))
+
+    def summary(self, percentiles=(5, 50, 95)):
+        """
+        Mean, standard deviation and percentiles of each output, as a dict
+        of dicts of arrays.
+        """
+        return {name: {"mean":        statistics.mean,
+                       "std":         statistics.std,
+                       "percentiles": statistics.percentile(percentiles)}
+                for name, statistics in self.statistics.items()}
+
+def sample_factors(tolerances, sizes, n_samples, rng, method):
+    """
+    Draws n_samples of the tolerance factors, with uniform variates from
+    rng ("monte_carlo") or from a Latin hypercube ("latin_hypercube")
+    mapped through each distribution's ppf. Returns a dict from tolerance
+    name to a (n_samples, sizes[name]) array.
+    """
+    n_columns = sum(sizes[name] for name in tolerances)
+    if method == "latin_hypercube":
+        u = qmc.LatinHypercube(d=n_columns, rng=rng).random(n_samples)
+    elif method == "monte_carlo":
+        u = rng.random((n_samples, n_columns))
+    else:
+        raise ValueError("Sampling method should be 'monte_carlo' or " + \
+                         "'latin_hypercube'.")
+
+    factors, start = dict(), 0
+    for name, distribution in tolerances.items():
+        stop = start + sizes[name]
+        factors[name] = distribution.ppf(u[:, start:stop])
+        start = stop
+    return factors
+
+def size_impellers(impellers, factors, n_samples):
+    """
+    Mass, polar and diametral inertia of each sampled impeller,
+    (n_samples, n_impellers) arrays. Impellers with scaled sizing inputs
+    are sized as one ImpellerBarskeBatch each; the impeller_mass factor
+    then scales mass and inertias.
+    """
+    properties = np.zeros((3, n_samples, len(impellers)))
+    for k, impeller in enumerate(impellers):
+        def scaled(name, nominal):
+            factor = factors.get("impeller_" + name)
+            return nominal if factor is None else nominal * factor[:, k]
+
+        si = impeller.si
+        if any("impeller_" + name in factors for name in sizing_inputs):
+            si = ImpellerBarskeBatch(impeller.design_point,
+                                     scaled("d0", si["d0"]),
+                                     scaled("dh", si["dh"]),
+                                     si["ds"],
+                                     scaled("phi", impeller.phi),
+                                     scaled("kb1", impeller.kb1),
+                                     scaled("psi", impeller.psi),
+                                     scaled("kb2", impeller.kb2),
+                                     impeller.z,
+                                     impeller.material,
+                                     scaled("l", si["l"]),
+                                     impeller.through_shaft).si
+        properties[:, :, k] = [scaled("mass", si[name])
+                               for name in ("mass", "ip", "id")]
+    return properties
+
+def impeller_disk_indices(rotor, mesh):
+    """
+    (disk index in the model data, impeller index in rotor.impellers) of
+    each impeller disk of a discretized Rotor. Impellers are told apart by
+    their layout position, so stages sharing one impeller part still get
+    their own samples.
+    """
+    position = {index: k for k, index in enumerate(
+                    [index for index, disk in enumerate(rotor.disks)
+                     if disk["kind"] == "impeller"])}
+    return [(j, position[index])
+            for j, (index, _) in enumerate(mesh.disk_nodes)
+            if index in position]
+
+def sample_model_data(data, factors, i, impeller_disks, mass, ip, id):
+    """
+    rotor_model_data() description of sample i: nominal mesh nodes, with
+    the shaft diameters, bearing and seal coefficients scaled by their
+    factors and the sampled impeller mass properties.
+    """
+    sample = dict(data)
+    mesh   = data["mesh"]
+    if "shaft_diameter" in factors:
+        diameter = mesh.element_diameter * \
+                   factors["shaft_diameter"][i, mesh.element_segment]
+        sample["mesh"] = ShaftMesh(mesh.element_length, diameter,
+                                   mesh.element_segment, mesh.bearing_nodes,
+                                   mesh.disk_nodes, mesh.seal_nodes)
+
+    for kind in ("bearings", "seals"):
+        stiffness = factors.get(kind[:-1] + "_stiffness")
+        damping   = factors.get(kind[:-1] + "_damping")
+        components = []
+        for j, component in enumerate(data[kind]):
+            component = dict(component)
+            if stiffness is not None:
+                component["kxx"] = component["kxx"] * stiffness[i, j]
+                component["kyy"] = component["kyy"] * stiffness[i, j]
+            if damping is not None:
+                component["cxx"] = component["cxx"] * damping[i, j]
+                component["cyy"] = component["cyy"] * damping[i, j]
+            components.append(component)
+        sample[kind] = components
+
+    sample["disks"] = list(data["disks"])
+    for j, k in impeller_disks:
+        sample["disks"][j] = dict(data["disks"][j], m=mass[k], Ip=ip[k],
+                                  Id=id[k])
+    return sample
+
+def tolerance_task(task):
+    """
+    Process pool worker: draws one chunk of samples from its own seed
+    sequence, sizes its impellers and solves the Campbell diagram of every
+    sample. Returns the chunk outputs (see ToleranceStatistics).
+    """
+    (data, impellers, impeller_disks, tolerances, sizes, speeds, n_modes,
+     n_internal_modes, method, n_samples, seed) = task
+    rng = np.random.default_rng(seed)
+    factors = sample_factors(tolerances, sizes, n_samples, rng, method)
+    mass, ip, id = size_impellers(impellers, factors, n_samples)
+
+    wd = np.full((n_samples, len(speeds), n_modes), np.nan)
+    for i in range(n_samples):
+        sample = sample_model_data(data, factors, i, impeller_disks,
+                                   mass[i], ip[i], id[i])
+        if n_internal_modes is None:
+            wd[i] = BeamRotor(sample).campbell(speeds, n_modes)
+        else:
+            from .rotordynamics import campbell_task
+            wd[i] = campbell_task((sample, speeds, n_modes, n_internal_modes))
+
+    design_speed = data["design_speed"]
+    critical = synchronous_crossings(np.broadcast_to(speeds, wd.shape[:-1]),
+                                     wd)
+    margins  = (critical - design_speed) / design_speed
+    return {"critical_speeds": critical,
+            "margins":         margins,
+            "min_margin":      np.min(np.abs(np.nan_to_num(margins,
+                                                           nan=np.inf)),
+                                      axis=-1),
+            "impeller_mass":   mass}
+
+def propagate_tolerances(rotor, tolerances, speeds, element_dx, n_samples,
+                         n_modes=4, required_margin=0.2,
+                         method="latin_hypercube", relative_speeds=False,
+                         n_internal_modes=None, chunk_size=64, seed=0,
+                         max_workers=None, n_bins=1024):
+    """
+    Propagates tolerances through the critical speeds of a Rotor.
+
+    tolerances maps input names to distributions (scipy.stats frozen
+    distributions, or any object with a vectorized ppf) of multiplicative
+    factors on the nominal values; each component gets its own draw:
+
+        shaft_diameter              diameter of each shaft segment
+        impeller_mass               mass and inertias of each impeller
+        impeller_<input>            ImpellerBarske sizing input of each
+                                    impeller, <input> in sizing_inputs
+        bearing_stiffness, _damping kxx and kyy, cxx and cyy of each bearing
+        seal_stiffness, _damping    same for each seal with coefficients
+
+    e.g. {"impeller_mass": scipy.stats.norm(1, 0.03)}. The mesh nodes stay
+    nominal. Samples are solved on the beam model (see analyses.beam), or,
+    with n_internal_modes, on the ReducedRotor of their ROSS model, over
+    speeds (rad/s, or fractions of the design speed with relative_speeds).
+
+    Samples are drawn in chunks of chunk_size, each from its own child of
+    np.random.SeedSequence(seed), so results depend on seed and chunk_size
+    but not on max_workers (1 runs in-process). With "latin_hypercube",
+    each chunk is one Latin hypercube design.
+
+    Returns a ToleranceStatistics; a sample violates the margin when
+    the critical speed closest to the design speed is within
+    required_margin of it.
+    """
+    element_dx = strip_units(element_dx, "length")
+    speeds = np.asarray(strip_units(speeds, "angular_velocity"), dtype=float)
+    mesh = discretize_rotor(rotor, element_dx)
+    design_speed = rotor.impeller["impeller"].design_point.si["omega"]
+    if relative_speeds:
+        speeds = design_speed * speeds
+    data = rotor_model_data(rotor, mesh, speeds)
+
+    impellers = [disk["impeller"] for disk in rotor.impellers]
+    impeller_disks = impeller_disk_indices(rotor, mesh)
+    sizes = {"shaft_diameter":    rotor.shaft.n_segments,
+             "bearing_stiffness": len(data["bearings"]),
+             "bearing_damping":   len(data["bearings"]),
+             "seal_stiffness":    len(data["seals"]),
+             "seal_damping":      len(data["seals"])}
+    for name in ("mass",) + sizing_inputs:
+        sizes["impeller_" + name] = len(impellers)
+    for name in tolerances:
+        if name not in sizes:
+            raise ValueError("Unknown tolerance " + name + ".")
+
+    start = time.perf_counter()
+    chunks = [min(chunk_size, n_samples - i)
+              for i in range(0, n_samples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    tasks = [(data, impellers, impeller_disks, tolerances, sizes, speeds,
+              n_modes, n_internal_modes, method, n, child)
+             for n, child in zip(chunks, seeds)]
+
+    statistics = {name: RunningStatistics(n_bins)
+                  for name in ("critical_speeds", "margins", "min_margin",
+                               "impeller_mass")}
+    violations = 0
+    def fold(results):
+        nonlocal violations
+        for outputs in results:
+            for name, values in outputs.items():
+                statistics[name].update(values)
+            violations += np.count_nonzero(outputs["min_margin"]
+                                           < required_margin)
+
+    if max_workers == 1:
+        fold(map(tolerance_task, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers,
+                                 initializer=init_worker) as pool:
+            fold(pool.map(tolerance_task, tasks))
+
+    return ToleranceStatistics(statistics, required_margin, violations,
+                               time.perf_counter() - start)
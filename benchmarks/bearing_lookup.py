@@ -0,0 +1,85 @@
+"""
+Bearing equivalent dynamic load lookup benchmark: the scalar path (one
+equivalentDynamicLoad-style call per load point, rebuilding the extended
+tables each time) against BearingAdvanced.equivalentDynamicLoads, which
+interpolates precomputed tables with a single searchsorted.
+
+Run with the package importable: python -m pump_analysis.benchmarks.bearing_lookup
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from ..parts.bearing import BearingAdvanced
+
+# deep groove ball bearing catalog table
+#   i*f0*Fa/C0r |  e  | X | Y | X   |  Y
+table = np.array([[0.172, 0.19, 1.0, 0.0, 0.56, 2.30],
+                  [0.345, 0.22, 1.0, 0.0, 0.56, 1.99],
+                  [0.689, 0.26, 1.0, 0.0, 0.56, 1.71],
+                  [1.03,  0.28, 1.0, 0.0, 0.56, 1.55],
+                  [1.38,  0.30, 1.0, 0.0, 0.56, 1.45],
+                  [2.07,  0.34, 1.0, 0.0, 0.56, 1.31],
+                  [3.45,  0.38, 1.0, 0.0, 0.56, 1.15],
+                  [5.17,  0.42, 1.0, 0.0, 0.56, 1.04],
+                  [6.89,  0.44, 1.0, 0.0, 0.56, 1.00]])
+
+bearing = BearingAdvanced(name                     = "Benchmark",
+                          bore_diameter            = 0.012,
+                          outer_diameter           = 0.032,
+                          width                    = 0.010,
+                          load_center              = 0.005,
+                          contact_angle            = 0.0,
+                          factor                   = 12.5,
+                          static_load_rating       = 3850.0,
+                          dynamic_load_rating      = 7900.0,
+                          equiv_dynamic_load_table = table)
+
+def scalar_load(bearing, fa, fr):
+    """
+    Former per-point lookup (list concatenation + np.interp per column).
+    """
+    table = bearing.table
+    criterion = bearing.i * bearing.f0 * fa / bearing.si["C0r"]
+    e = np.interp(criterion, [0] + list(table[:,0]),
+                  [bearing.e_0] + list(table[:,1]))
+    if fa/fr <= e:
+        X = np.interp(criterion, table[:,0], table[:,2])
+        Y = np.interp(criterion, table[:,0], table[:,3])
+    else:
+        X = np.interp(criterion, table[:,0], table[:,4])
+        Y = np.interp(criterion, [0] + list(table[:,0]),
+                      [bearing.Y_0] + list(table[:,5]))
+    return X*fr + Y*fa
+
+def best_of(function, repeats=3):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+if __name__ == "__main__":
+    n_points = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n_scalar = min(n_points, 20_000)
+
+    rng = np.random.default_rng(0)
+    fa = rng.uniform(0.0, 2000.0, n_points)
+    fr = rng.uniform(1.0, 3000.0, n_points)
+
+    reference = np.array([scalar_load(bearing, a, r)
+                          for a, r in zip(fa[:n_scalar], fr[:n_scalar])])
+    P = bearing.equivalentDynamicLoads(fa, fr)[0]
+    error = np.max(np.abs(P[:n_scalar] - reference) / reference)
+
+    t_scalar = best_of(lambda: [scalar_load(bearing, a, r) for a, r
+                                in zip(fa[:n_scalar], fr[:n_scalar])], 1)
+    t_vector = best_of(lambda: bearing.equivalentDynamicLoads(fa, fr))
+
+    print(f"max relative difference: {error:.2e}")
+    print(f"scalar path:     {t_scalar / n_scalar * 1e9:10.1f} ns/point")
+    print(f"vectorized path: {t_vector / n_points * 1e9:10.1f} ns/point "
+          f"({n_points} points, x{t_scalar / n_scalar * n_points / t_vector:.0f})")
@@ -0,0 +1,55 @@
+"""
+Import-time benchmark: `import pump_analysis` followed by use of the sizing
+code (parts, fluids, materials) must not pull in ROSS or matplotlib.
+
+Run from anywhere: python benchmarks/import_time.py [repeats]
+"""
+
+import os
+import subprocess
+import sys
+
+package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+package     = os.path.basename(package_dir)
+
+heavy_modules = ("ross", "matplotlib", "plotly", "pandas")
+
+script = f"""
+import sys, time
+start = time.perf_counter()
+import {package} as pa
+from {package}.parts.impeller import ImpellerBarske
+from {package}.fluids import liquid_oxygen
+from {package}.materials import steel_304l
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy_modules!r} if m in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+def measure(code):
+    """
+    Runs code in a fresh interpreter, returns its printed (time, modules).
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.path.dirname(package_dir), env.get("PYTHONPATH", "")])
+    output = subprocess.run([sys.executable, "-c", code], env=env,
+                            check=True, capture_output=True, text=True)
+    fields = output.stdout.split()
+    return float(fields[0]), fields[1] if len(fields) > 1 else ""
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    times = []
+    for _ in range(repeats):
+        elapsed, heavy = measure(script)
+        times.append(elapsed)
+
+    print(f"import {package} + sizing modules: "
+          f"best {min(times)*1e3:.1f} ms, "
+          f"median {sorted(times)[len(times)//2]*1e3:.1f} ms "
+          f"({repeats} runs)")
+    if heavy:
+        raise SystemExit(f"heavy modules imported eagerly: {heavy}")
+    print("no heavy modules imported (" + ", ".join(heavy_modules) + ")")
@@ -0,0 +1,52 @@
+"""
+Operating point solver benchmark: Monte Carlo over fluid density, static
+pressure and line resistance for the overhung pump, solved as one batch
+with analyses.performance.operating_points, and checked against the
+closed-form roots of the (quadratic) head model.
+
+Run with the package importable: python -m pump_analysis.benchmarks.operating_points
+"""
+
+import sys
+
+import numpy as np
+
+from .. import g_n
+from ..analyses.performance import operating_points, head_model
+from ..examples import overhung
+from ..fluids import Fluid
+
+if __name__ == "__main__":
+    n_points = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    impeller = overhung.impeller
+    design   = overhung.design_point
+    rng      = np.random.default_rng(0)
+
+    density         = rng.normal(design.fluid.si["rho"], 20.0, n_points)
+    static_pressure = rng.uniform(0.0, 0.5, n_points) * design.si["dp"]
+    resistance      = rng.uniform(0.5, 2.0, n_points) * \
+                      design.si["h"] / design.si["q"]**2
+    fluid = Fluid(name           = "Monte Carlo",
+                  density        = density,
+                  vapor_pressure = design.fluid.si["pv"],
+                  viscosity      = design.fluid.si["mu"])
+
+    result = operating_points(impeller, static_pressure, resistance,
+                              fluid = fluid)
+
+    # head model roots: a q**2 - b q - c = 0
+    shutoff, incidence, friction, q_design = head_model(
+            impeller, design.si["omega"])
+    a = incidence + friction + resistance
+    b = 2 * incidence * q_design
+    c = shutoff - (incidence - friction) * q_design**2 \
+        - static_pressure / (density * g_n)
+    exact = 2*c / (np.sqrt(b**2 + 4*a*c) - b)
+    error = np.nanmax(np.abs(result.flow - exact) / exact)
+
+    print(f"{n_points} operating points, {result.converged.mean():.1%} solved")
+    print(f"iterations: mean {result.iterations.mean():.2f}, "
+          f"max {result.iterations.max()}")
+    print(f"max relative flow error: {error:.2e}")
+    print(f"throughput: {result.throughput:.3g} points/s")
@@ -0,0 +1,94 @@
+"""
+Drawing geometry preparation benchmark, per figure: the former path
+(impeller outline as lists of quantities, converted item by item with
+.to(unit).magnitude) against the code the drawings run now: SI outlines
+and rotor segment arrays (impeller_layers, rotor_layers), scaled once into
+the display unit (length_scale) at render time.
+
+Run with the package importable: python -m pump_analysis.benchmarks.plot_geometry
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from .. import unit, display_units
+from ..examples import multistage
+from ..plotting import impeller_layers, length_scale, rotor_layers
+
+def outline_quantities(impeller):
+    """
+    Impeller outline as lists of quantities, as the drawings used to be
+    built (x from the hub face, y as radii).
+    """
+    si = impeller.si
+    m = unit("m")
+    x = [0.0*m, 0.0*m, -(si["b1"] - si["b2"])*m, 0.0*m, si["b2"]*m,
+         si["b2"]*m, si["l"]*m, si["l"]*m, 0.0*m]
+    y = [si["ds"]/2*m, impeller.d1/2, impeller.d1/2, impeller.d2/2,
+         impeller.d2/2, impeller.dh/2, impeller.dh/2, impeller.ds/2,
+         impeller.ds/2]
+    return x, y
+
+def loop_array(quantity_list, unit):
+    """
+    Former plotting.array: one conversion per item.
+    """
+    array_mag = []
+    for quantity in quantity_list:
+        array_mag.append(quantity.to(unit).magnitude)
+    return np.array(array_mag)
+
+def scaled(layers, scale):
+    """
+    Layer segments in the display unit, as render_layers draws them.
+    """
+    return [segments * scale for segments, _ in layers]
+
+def best_of(function, repeats=5):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+if __name__ == "__main__":
+    n_figures = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    rotor     = multistage.rotor
+    impellers = [disk["impeller"] for disk in rotor.impellers]
+    length    = display_units["length"]
+    outlines  = [outline_quantities(impeller) for impeller in impellers]
+
+    def legacy():
+        return [(loop_array(x, length), loop_array(y, length))
+                for x, y in outlines]
+
+    def impeller_drawings():
+        _, scale = length_scale()
+        return [scaled(impeller_layers(impeller), scale)
+                for impeller in impellers]
+
+    def rotor_drawing():
+        _, scale = length_scale()
+        return scaled(rotor_layers(rotor), scale)
+
+    # the impeller drawings trace the same outline as the legacy lists
+    for (x, y), layers in zip(legacy(), impeller_drawings()):
+        points = np.concatenate([segments.reshape(-1, 2)
+                                 for segments in layers])
+        outline = np.column_stack((x, y))
+        assert all(np.isclose(points, point).all(axis=1).any()
+                   for point in outline)
+
+    t_legacy   = best_of(lambda: [legacy() for _ in range(n_figures)])
+    t_impeller = best_of(lambda: [impeller_drawings()
+                                  for _ in range(n_figures)])
+    t_rotor    = best_of(lambda: [rotor_drawing() for _ in range(n_figures)])
+
+    print(f"{len(impellers)} impeller outlines per figure")
+    print(f"item-by-item conversion: {t_legacy / n_figures * 1e3:8.3f} ms/figure")
+    print(f"impeller_layers:         {t_impeller / n_figures * 1e3:8.3f} ms/figure")
+    print(f"full rotor_layers:       {t_rotor / n_figures * 1e3:8.3f} ms/figure")
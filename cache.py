@@ -0,0 +1,200 @@
+"""
+Persistent, content-addressed cache of computed arrays.
+
+Results (sized impeller geometry, discretized rotors) are stored as .npz
+files named after a stable hash of everything they were computed from,
+including format_version and the source code of the computing module (see
+code_hash), so a later run with the same inputs and code loads them instead
+of recomputing. The cache
+folder is bounded in size and evicts the least recently used entries.
+
+The cache is off unless configured: set the PUMP_ANALYSIS_CACHE environment
+variable to a folder (and optionally PUMP_ANALYSIS_CACHE_SIZE to a size in
+bytes), or call configure().
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+
+from . import ureg
+
+# layout of the stored entries; bump to invalidate every entry
+format_version = 1
+
+def feed(digest, value):
+    """
+    Adds a canonical, type-tagged encoding of value to a hashlib digest.
+    """
+    if value is None:
+        digest.update(b"N")
+    elif isinstance(value, (bool, np.bool_)):
+        digest.update(b"b1" if value else b"b0")
+    elif isinstance(value, (int, float, np.integer, np.floating)):
+        digest.update(b"f" + np.float64(value).tobytes())
+    elif isinstance(value, str):
+        encoded = value.encode()
+        digest.update(b"s" + len(encoded).to_bytes(8, "little") + encoded)
+    elif isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value)
+        digest.update(b"a" + value.dtype.str.encode()
+                      + repr(value.shape).encode())
+        digest.update(value.tobytes())
+    elif isinstance(value, ureg.Quantity):
+        base = value.to_base_units()
+        feed(digest, str(base.units))
+        feed(digest, np.asarray(base.magnitude, dtype=float))
+    elif isinstance(value, dict):
+        digest.update(b"d" + len(value).to_bytes(8, "little"))
+        for key in sorted(value):
+            feed(digest, key)
+            feed(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"l" + len(value).to_bytes(8, "little"))
+        for item in value:
+            feed(digest, item)
+    elif hasattr(value, "cache_key"):
+        feed(digest, type(value).__name__)
+        feed(digest, value.cache_key())
+    elif hasattr(value, "si"):
+        feed(digest, type(value).__name__)
+        feed(digest, getattr(value, "name", None))
+        feed(digest, value.si)
+    else:
+        raise TypeError("Cannot hash " + type(value).__name__ + " for " + \
+                        "the cache.")
+
+def stable_hash(*values):
+    """
+    Hex digest identifying values across runs and machines.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    feed(digest, values)
+    return digest.hexdigest()
+
+@functools.lru_cache(maxsize=None)
+def code_hash(source):
+    """
+    Hex digest of the source code of a module, class or function, for cache
+    keys to change with the code computing the entries. Without available
+    source (frozen builds), falls back to the compiled code of a function,
+    or to the object's name.
+    """
+    try:
+        text = inspect.getsource(source)
+    except (OSError, TypeError):
+        code = getattr(source, "__code__", None)
+        text = code.co_code.hex() if code is not None else \
+               getattr(source, "__name__", repr(source))
+    return stable_hash(text)
+
+class DiskCache:
+    """
+    Folder of .npz entries (dicts of arrays) keyed by stable_hash, bounded to
+    max_bytes with least recently used eviction (access times are kept in
+    the file modification times).
+    """
+    def __init__(self, directory, max_bytes=256 * 2**20):
+        """
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits      = 0
+        self.misses    = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def get(self, key):
+        """
+        Returns the stored dict of arrays, or None.
+        """
+        path = self.path(key)
+        try:
+            with np.load(path, allow_pickle=False) as entry:
+                arrays = {name: entry[name] for name in entry.files}
+            os.utime(path)
+        except (OSError, ValueError, zipfile.BadZipFile):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return arrays
+
+    def put(self, key, arrays):
+        """
+        Stores a dict of arrays (written atomically), then evicts the least
+        recently used entries beyond max_bytes.
+        """
+        handle, temporary = tempfile.mkstemp(dir=self.directory,
+                                             suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as file:
+                np.savez(file, **arrays)
+            os.replace(temporary, self.path(key))
+        except OSError:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            return
+        self.evict()
+
+    def entries(self):
+        """
+        (modification time, size, path) of every entry.
+        """
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npz"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            os.remove(path)
+        self.hits   = 0
+        self.misses = 0
+
+disk_cache = None
+
+def configure(directory, max_bytes=256 * 2**20):
+    """
+    Enables the persistent cache in directory (None disables it).
+    Returns the DiskCache.
+    """
+    global disk_cache
+    disk_cache = None
+    if directory:
+        disk_cache = DiskCache(directory, max_bytes)
+    return disk_cache
+
+def default_cache():
+    """
+    The configured DiskCache, or None when caching is off.
+    """
+    return disk_cache
+
+if os.environ.get("PUMP_ANALYSIS_CACHE"):
+    try:
+        configure(os.environ["PUMP_ANALYSIS_CACHE"],
+                  int(os.environ.get("PUMP_ANALYSIS_CACHE_SIZE",
+                                     256 * 2**20)))
+    except OSError:
+        disk_cache = None
@@ -1,4 +1,4 @@
 """
 """
 
-from . import overhung, outboard_bearing
+from . import overhung, outboard_bearing, multistage
@@ -0,0 +1,126 @@
+"""
+"""
+
+from .. import unit
+from ..fluids import liquid_oxygen
+from ..materials import steel_304l
+from ..parts.impeller import ImpellerBarske
+from ..parts.bearing import Bearing, BearingCoefficients
+from ..parts.seal import ShaftSeal
+from ..parts.misc import Disk, ShaftCoupler
+from ..parts.shaft import Shaft
+from ..rotor import Rotor
+from .. import DesignPoint
+
+stage_count = 6
+
+bearing_large = Bearing(name                = "BearingLarge",
+                        bore_diameter       = 12.0 * unit("mm"),
+                        outer_diameter      = 32.0 * unit("mm"),
+                        width               = 10.0 * unit("mm"),
+                        load_center         = 7.9  * unit("mm"),
+                        contact_angle       = 15.0 * unit("deg"),
+                        factor              = 12.5,
+                        static_load_rating  = 3.85 * unit("kilonewton"),
+                        dynamic_load_rating = 7.90 * unit("kilonewton"),
+                        kxx = [1e7],
+                        kyy = [1e7],
+                        cxx = [1e4],
+                        frequency = None)
+
+interstage_seal = ShaftSeal(name           = "InterstageSeal",
+                            bore_diameter  = 11.2 * unit("mm"),
+                            outer_diameter = 20.0 * unit("mm"),
+                            length         = 8.0  * unit("mm"),
+                            coefficients   = BearingCoefficients.from_lists(
+                                kxx = [2e5],
+                                kyy = [2e5],
+                                cxx = [50.0]))
+
+coupling = ShaftCoupler(name              = "Coupling",
+                        bore_diameter     = 10.0 * unit("mm"),
+                        outer_diameter    = 30.0 * unit("mm"),
+                        length            = 16.0 * unit("mm"),
+                        mass              = 0.06 * unit("kg"),
+                        polar_inertia     = 7.0e-6 * unit("kg*m**2"),
+                        diametral_inertia = 5.0e-6 * unit("kg*m**2"))
+
+inducer = Disk(name              = "Inducer",
+               bore_diameter     = 10.0 * unit("mm"),
+               outer_diameter    = 26.0 * unit("mm"),
+               length            = 10.0 * unit("mm"),
+               mass              = 0.02 * unit("kg"),
+               polar_inertia     = 1.5e-6 * unit("kg*m**2"),
+               diametral_inertia = 1.0e-6 * unit("kg*m**2"))
+
+design_point = DesignPoint(fluid =            liquid_oxygen,
+                           mass_flowrate =    1.3 * unit("kg/s"),
+                           pressure_rise =    100.0 * unit("psi"),
+                           rotational_speed = 30000. * unit("rpm"))
+
+impeller = ImpellerBarske(design_point =                   design_point,
+                          diameter_inlet =                 1.1 * unit("inch"),
+                          diameter_hub =                   16 * unit("mm"),
+                          diameter_shaft =                 10 * unit("mm"),
+                          flow_coefficient_suction =       0.06,
+                          blockage_coefficient_suction =   0.8,
+                          head_recovery_coefficient =      0.35,
+                          blockage_coefficient_discharge = 0.92,
+                          blade_count =                    6,
+                          material =                       steel_304l,
+                          length_hub =                     15 * unit("mm"),
+                          through_shaft =                  True)
+
+# coupling, drive end bearing, inducer, stages (impeller + interstage seal),
+# non-drive end bearing
+shaft_segments = [
+        {"diameter": 10.0 * unit("mm"), "length": 20.0 * unit("mm")},
+        {"diameter": 12.0 * unit("mm"), "length": 12.0 * unit("mm")},
+        {"diameter": 14.0 * unit("mm"), "length": 10.0 * unit("mm")},
+        {"diameter": 10.0 * unit("mm"), "length": 10.0 * unit("mm")},
+    ]
+for stage in range(stage_count):
+    shaft_segments += [
+        {"diameter": 10.0 * unit("mm"), "length": 15.0 * unit("mm")},
+        {"diameter": 11.0 * unit("mm"), "length": 8.0  * unit("mm")},
+        ]
+shaft_segments += [
+        {"diameter": 14.0 * unit("mm"), "length": 10.0 * unit("mm")},
+        {"diameter": 12.0 * unit("mm"), "length": 12.0 * unit("mm")},
+        {"diameter": 10.0 * unit("mm"), "length": 12.0 * unit("mm")},
+    ]
+
+shaft = Shaft(material = steel_304l,
+              segments = shaft_segments)
+
+rotor = Rotor(shaft)
+
+rotor.addDisk(part        = coupling,
+              segment_id  = 0,
+              side        = "left",
+              orientation = "left")
+
+rotor.addBearing(model       = bearing_large,
+                 segment_id  = 1,
+                 side        = "right",
+                 orientation = "right")
+
+rotor.addDisk(part        = inducer,
+              segment_id  = 3,
+              side        = "left",
+              orientation = "left")
+
+for stage in range(stage_count):
+    rotor.addImpeller(impeller_data = impeller,
+                      segment_id    = 4 + 2*stage,
+                      side          = "left",
+                      orientation   = "left")
+
+    rotor.addSeal(seal       = interstage_seal,
+                  segment_id = 5 + 2*stage,
+                  side       = "left")
+
+rotor.addBearing(model       = bearing_large,
+                 segment_id  = 5 + 2*stage_count,
+                 side        = "left",
+                 orientation = "left")
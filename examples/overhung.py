@@ -1,7 +1,7 @@
 """
 """
 
-from .. import ureg
+from .. import unit
 from ..fluids import liquid_oxygen
 from ..materials import steel_304l
 from ..parts.impeller import ImpellerBarske
@@ -11,43 +11,43 @@ from ..rotor import Rotor
 from .. import DesignPoint
 
 bearing_large = Bearing(name                = "BearingLarge",
-                        bore_diameter       = 12.0 * ureg("mm"),
-                        outer_diameter      = 32.0 * ureg("mm"),
-                        width               = 10.0 * ureg("mm"),
-                        load_center         = 7.9  * ureg("mm"),
-                        contact_angle       = 15.0 * ureg("deg"),
+                        bore_diameter       = 12.0 * unit("mm"),
+                        outer_diameter      = 32.0 * unit("mm"),
+                        width               = 10.0 * unit("mm"),
+                        load_center         = 7.9  * unit("mm"),
+                        contact_angle       = 15.0 * unit("deg"),
                         factor              = 12.5,
-                        static_load_rating  = 3.85 * ureg("kilonewton"),
-                        dynamic_load_rating = 7.90 * ureg("kilonewton"),
+                        static_load_rating  = 3.85 * unit("kilonewton"),
+                        dynamic_load_rating = 7.90 * unit("kilonewton"),
                         kxx = [1e7], 
                         kyy = [1e7],
                         cxx = [1e4],
                         frequency = None)
 
 design_point = DesignPoint(fluid =            liquid_oxygen,
-                           mass_flowrate =    1.3 * ureg("kg/s"),
-                           pressure_rise =    600.0 * ureg("psi"),
-                           rotational_speed = 30000. * ureg("rpm"))
+                           mass_flowrate =    1.3 * unit("kg/s"),
+                           pressure_rise =    600.0 * unit("psi"),
+                           rotational_speed = 30000. * unit("rpm"))
 
 impeller = ImpellerBarske(design_point =                   design_point,
-                          diameter_inlet =                 1.1 * ureg("inch"),
-                          diameter_hub =                   16 * ureg("mm"),
-                          diameter_shaft =                 10 * ureg("mm"),
+                          diameter_inlet =                 1.1 * unit("inch"),
+                          diameter_hub =                   16 * unit("mm"),
+                          diameter_shaft =                 10 * unit("mm"),
                           flow_coefficient_suction =       0.06,
                           blockage_coefficient_suction =   0.8,
                           head_recovery_coefficient =      0.35,
                           blockage_coefficient_discharge = 0.92,
                           blade_count =                    6,
                           material =                       steel_304l,
-                          length_hub =                     15 * ureg("mm"),
+                          length_hub =                     15 * unit("mm"),
                           through_shaft =                  False)
 shaft_segments = [
-        {"diameter": 10.0 * ureg("mm"),  "length": 14.0 * ureg("mm")},
-        {"diameter": 11.0 * ureg("mm"), "length": 20.0 * ureg("mm")},
-        {"diameter": 12.0 * ureg("mm"), "length": 10.0 * ureg("mm")},
-        {"diameter": 16.0 * ureg("mm"), "length": 20.0 * ureg("mm")},
-        {"diameter": 12.0 * ureg("mm"), "length": 12.0 * ureg("mm")},
-        {"diameter": 10.0 * ureg("mm"), "length": 12.0 * ureg("mm")},
+        {"diameter": 10.0 * unit("mm"),  "length": 14.0 * unit("mm")},
+        {"diameter": 11.0 * unit("mm"), "length": 20.0 * unit("mm")},
+        {"diameter": 12.0 * unit("mm"), "length": 10.0 * unit("mm")},
+        {"diameter": 16.0 * unit("mm"), "length": 20.0 * unit("mm")},
+        {"diameter": 12.0 * unit("mm"), "length": 12.0 * unit("mm")},
+        {"diameter": 10.0 * unit("mm"), "length": 12.0 * unit("mm")},
     ]
 
 shaft = Shaft(material = steel_304l,
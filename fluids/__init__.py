@@ -1,7 +1,7 @@
 """
 """
 
-from .. import ureg
+from .. import unit, strip_units
 
 class Fluid:
     def __init__(self, name, density, vapor_pressure, viscosity):
@@ -12,7 +12,12 @@ class Fluid:
         self.pv   = vapor_pressure
         self.mu   = viscosity
 
+        self.si = dict()
+        self.si["rho"] = strip_units(density, "density")
+        self.si["pv"]  = strip_units(vapor_pressure, "pressure")
+        self.si["mu"]  = strip_units(viscosity, "viscosity")
+
 liquid_oxygen = Fluid(name           = "LOX",
-                      density        = 1140.0 * ureg("kg/m**3"),
-                      vapor_pressure = 1.0 * ureg("atm"),
-                      viscosity      = 1.7e-7 * ureg("newton*s/m**2"))
+                      density        = 1140.0 * unit("kg/m**3"),
+                      vapor_pressure = 1.0 * unit("atm"),
+                      viscosity      = 1.7e-7 * unit("newton*s/m**2"))
@@ -1,7 +1,7 @@
 """
 """
 
-from .. import ureg
+from .. import unit, strip_units
 
 class Material:
     """
@@ -14,7 +14,12 @@ class Material:
         self.e    = modulus
         self.nu   = poisson
 
+        self.si = dict()
+        self.si["rho"] = strip_units(density, "density")
+        self.si["e"]   = strip_units(modulus, "pressure")
+        self.si["nu"]  = strip_units(poisson, "dimensionless")
+
 steel_304l = Material(name = "Steel_304L",
-                      density = 7830.0 * ureg("kg/m**3"),
-                      modulus = 28.0e6 * ureg("psi"),
+                      density = 7830.0 * unit("kg/m**3"),
+                      modulus = 28.0e6 * unit("psi"),
                       poisson = 0.3)
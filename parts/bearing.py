@@ -2,14 +2,110 @@
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
+
+from .. import strip_units
+
+# basic rating life exponent for ball bearings
+life_exponent = 3.0
+
+def bearing_si(bearing):
+    """
+    Converts bearing catalog dimensions and ratings to SI base units.
+    """
+    si = dict()
+    si["d"]     = strip_units(bearing.d, "length")
+    si["D"]     = strip_units(bearing.D, "length")
+    si["B"]     = strip_units(bearing.B, "length")
+    si["a"]     = strip_units(bearing.a, "length")
+    si["alpha"] = strip_units(bearing.alpha, "angle")
+    si["C0r"]   = strip_units(bearing.C0r, "force")
+    si["Cr"]    = strip_units(bearing.Cr, "force")
+    return si
+
+def grid_interval(grid, x):
+    """
+    Lower node index and fractional position of x on an ascending grid,
+    clamped to the grid ends (one searchsorted).
+    """
+    x = np.clip(x, grid[0], grid[-1])
+    if len(grid) == 1:
+        return np.zeros(x.shape, dtype=int), np.zeros(x.shape)
+    i = np.clip(np.searchsorted(grid, x, side="right") - 1, 0, len(grid) - 2)
+    return i, (x - grid[i]) / (grid[i + 1] - grid[i])
+
+class BearingCoefficients:
+    """
+    Bearing stiffness and damping tabulated over speed and, optionally,
+    axial load (preload).
+
+    Tables are arrays of shape (n_speed,) or (n_speed, n_axial_load), in SI
+    base units (N/m, N.s/m). Evaluation is bilinear, clamped to the table
+    ranges, and vectorized over any speeds and axial loads.
+    """
+    names = ("kxx", "kyy", "cxx", "cyy")
+
+    def __init__(self, speed, kxx, kyy, cxx, cyy=None, axial_load=None):
+        """
+        """
+        self.speed = np.atleast_1d(
+                np.asarray(strip_units(speed, "angular_velocity"), dtype=float))
+        if axial_load is None:
+            self.axial_load = np.zeros(1)
+        else:
+            self.axial_load = np.atleast_1d(
+                    np.asarray(strip_units(axial_load, "force"), dtype=float))
+        if cyy is None:
+            cyy = cxx
+
+        shape = (len(self.speed), len(self.axial_load))
+        self.table = np.ascontiguousarray(
+                [np.asarray(value, dtype=float).reshape(shape)
+                 for value in (kxx, kyy, cxx, cyy)])
+
+    @classmethod
+    def from_lists(cls, kxx, kyy, cxx, frequency=None):
+        """
+        Coefficients in the ROSS bearing format: lists over frequency, or a
+        single constant value when frequency is None.
+        """
+        if frequency is None:
+            frequency = [0.0]
+        return cls(frequency, kxx, kyy, cxx)
+
+    def evaluate(self, speed, axial_load=0.0):
+        """
+        Returns kxx, kyy, cxx and cyy at the broadcast shape of speed (rad/s)
+        and axial_load (N).
+        """
+        speed = np.asarray(strip_units(speed, "angular_velocity"), dtype=float)
+        axial_load = np.asarray(strip_units(axial_load, "force"), dtype=float)
+        speed, axial_load = np.broadcast_arrays(speed, axial_load)
+
+        i, u = grid_interval(self.speed, speed)
+        j, v = grid_interval(self.axial_load, axial_load)
+        i1 = np.minimum(i + 1, len(self.speed) - 1)
+        j1 = np.minimum(j + 1, len(self.axial_load) - 1)
+
+        table = self.table
+        values = ((1 - u) * (1 - v) * table[:, i, j]
+                  + u * (1 - v) * table[:, i1, j]
+                  + (1 - u) * v * table[:, i, j1]
+                  + u * v * table[:, i1, j1])
+        return tuple(values)
 
 class Bearing:
     def __init__(self, name, bore_diameter, outer_diameter, width,
                  load_center, contact_angle, factor, static_load_rating,
-                 dynamic_load_rating, kxx, kyy, cxx, frequency=None):
+                 dynamic_load_rating, kxx=None, kyy=None, cxx=None,
+                 frequency=None, coefficients=None):
         """
         Initialize bearing object from manufacturer data.
+
+        Rotordynamic coefficients are given either as ROSS-style kxx, kyy,
+        cxx lists (over frequency), or as a BearingCoefficients table. The
+        models only read self.coefficients: kxx, kyy, cxx and frequency are
+        read-only views of it, and coefficients are changed by assigning a
+        new table (e.g. BearingCoefficients.from_lists).
         """
         self.name = name
         self.d = bore_diameter
@@ -20,15 +116,54 @@ class Bearing:
         self.f0 = factor
         self.C0r = static_load_rating
         self.Cr = dynamic_load_rating
-        self.kxx = kxx
-        self.kyy = kyy
-        self.cxx = cxx
-        self.frequency = frequency
+        if coefficients is None and kxx is not None:
+            coefficients = BearingCoefficients.from_lists(kxx, kyy, cxx,
+                                                          frequency)
+        self.coefficients = coefficients
+        self.si = bearing_si(self)
+
+    def coefficient(self, name):
+        """
+        Table of one coefficient (see BearingCoefficients.names) in SI base
+        units, over frequency and, when tabulated, axial load: a float for
+        constant coefficients, None without coefficients.
+        """
+        if self.coefficients is None:
+            return None
+        table = self.coefficients.table[BearingCoefficients.names.index(name)]
+        if table.shape[1] == 1:
+            table = table[:, 0]
+        if table.size == 1:
+            return float(table.flat[0])
+        return table.copy()
+
+    @property
+    def kxx(self):
+        return self.coefficient("kxx")
+
+    @property
+    def kyy(self):
+        return self.coefficient("kyy")
+
+    @property
+    def cxx(self):
+        return self.coefficient("cxx")
+
+    @property
+    def frequency(self):
+        """
+        Speeds of the coefficient table (rad/s), None for constant
+        coefficients.
+        """
+        if self.coefficients is None or len(self.coefficients.speed) == 1:
+            return None
+        return self.coefficients.speed.copy()
 
 class BearingAdvanced:
     def __init__(self, name, bore_diameter, outer_diameter, width,
                  load_center, contact_angle, factor, static_load_rating,
-                 dynamic_load_rating, equiv_dynamic_load_table, i = 1):
+                 dynamic_load_rating, equiv_dynamic_load_table, i = 1,
+                 coefficients=None):
         """
         Initialize bearing object from manufacturer data.
 
@@ -38,6 +173,9 @@ class BearingAdvanced:
         i*f0*Fa/C0r  |  e  |  X  |  Y  |  X  |  Y  |
 
         (n*6 array)
+
+        Rotordynamic coefficients, if any, are given as a BearingCoefficients
+        table.
         """
         self.name = name
         self.d = bore_diameter
@@ -51,6 +189,8 @@ class BearingAdvanced:
         self.table = equiv_dynamic_load_table
         self.i = i # 1 for single bearing, can be 2 for *some* dual
                    # bearing arrangements
+        self.coefficients = coefficients
+        self.si = bearing_si(self)
         if self.table is not None:
             self.extrapolateTable()
 
@@ -64,7 +204,39 @@ class BearingAdvanced:
 
         self.Y_0 = self.table[0,5] + (self.table[0,5] - self.table[1,5])\
                 *self.table[0,0]/(self.table[1,0]-self.table[0,0])
-    
+
+        # Interpolation tables on a common abscissa extended with the Fa = 0
+        # point: rows are e, X and Y for Fa/Fr <= e, X and Y for Fa/Fr > e.
+        # X, Y (Fa/Fr <= e) and X (Fa/Fr > e) are held constant below the
+        # first table entry, e and Y (Fa/Fr > e) use the extrapolated values.
+        self.criterion_ext = np.ascontiguousarray(
+                np.concatenate(([0.0], self.table[:,0])), dtype=np.float64)
+        self.load_table = np.ascontiguousarray(np.stack((
+                np.concatenate(([self.e_0], self.table[:,1])),
+                np.concatenate(([self.table[0,2]], self.table[:,2])),
+                np.concatenate(([self.table[0,3]], self.table[:,3])),
+                np.concatenate(([self.table[0,4]], self.table[:,4])),
+                np.concatenate(([self.Y_0], self.table[:,5])))),
+                dtype=np.float64)
+        self.load_slopes = np.ascontiguousarray(
+                np.diff(self.load_table, axis=1)
+                / np.diff(self.criterion_ext))
+
+    def interpolateTable(self, criterion):
+        """
+        Interpolates all load table rows at i*f0*Fa/C0r with a single
+        searchsorted, clamping outside the tabulated range like np.interp.
+        Returns e, X, Y (Fa/Fr <= e), X, Y (Fa/Fr > e).
+        """
+        x = self.criterion_ext
+        criterion = np.clip(criterion, x[0], x[-1])
+        index = np.searchsorted(x, criterion, side="right") - 1
+        index = np.clip(index, 0, len(x) - 2)
+        dx = criterion - x.take(index)
+
+        return tuple(row.take(index) + slope.take(index) * dx
+                     for row, slope in zip(self.load_table, self.load_slopes))
+
     def equivalentDynamicLoad(self, fa, fr, verbose=True):
         """
         Computes bearing equivalent dynamic load using linear interpolation
@@ -73,13 +245,16 @@ class BearingAdvanced:
          - e and Y assumed constant past final value of i*f0*Fa/C0r
 
          - e and Y limit value for Fa = 0 obtained by linear extrapolation
+
+        Loads are quantities or plain values in N; returns the load in N.
         """
+        fa = strip_units(fa, "force")
+        fr = strip_units(fr, "force")
 
-        criterion = self.i * self.f0 * fa / self.C0r
+        criterion = self.i * self.f0 * fa / self.si["C0r"]
 
-        e = np.interp(criterion,
-                      [0] + list(self.table[:,0]),
-                      [self.e_0] + list(self.table[:,1]))
+        e, X_below, Y_below, X_above, Y_above = \
+                self.interpolateTable(criterion)
          
         if verbose:
             print("###############################################")
@@ -90,16 +265,13 @@ class BearingAdvanced:
             print("#                                             #")
         
         if fa/fr <= e:
-            X = np.interp(criterion, self.table[:,0], self.table[:,2])
-            Y = np.interp(criterion, self.table[:,0], self.table[:,3])
+            X, Y = X_below, Y_below
             if verbose:
                 print("# Fa/Fr = {:.2f} <= e --> X = {:.2f} and Y = {:.2f} #"\
                         .format(fa/fr, X, Y))
             self.comparison = "<"
         else:
-            X = np.interp(criterion, self.table[:,0], self.table[:,4])
-            Y = np.interp(criterion, [0]+list(self.table[:,0]),
-                          [self.Y_0]+list(self.table[:,5]))
+            X, Y = X_above, Y_above
             if verbose:
                 print("# Fa/Fr = {:.2f} > e --> X = {:.2f} and Y = {:.2f}  #"\
                         .format(fa/fr, X, Y))
@@ -114,10 +286,69 @@ class BearingAdvanced:
 
         return X*fr + Y*fa
 
+    def equivalentDynamicLoads(self, fa, fr):
+        """
+        Vectorized equivalentDynamicLoad over arrays of axial and radial
+        loads (quantities, or plain arrays in N). Same interpolation and
+        extrapolation rules, no printing and no side effects on the bearing.
+
+        Returns P (N), e, X and Y as arrays of the broadcast load shape.
+        """
+        fa = np.asarray(strip_units(fa, "force"), dtype=float)
+        fr = np.asarray(strip_units(fr, "force"), dtype=float)
+        fa, fr = np.broadcast_arrays(fa, fr)
+
+        criterion = self.i * self.f0 * fa / self.si["C0r"]
+        e, X_below, Y_below, X_above, Y_above = \
+                self.interpolateTable(criterion)
+
+        # Fa/Fr <= e, written so that Fr = 0 needs no division
+        below = fa <= e * fr
+
+        X = np.where(below, X_below, X_above)
+        Y = np.where(below, Y_below, Y_above)
+
+        return X*fr + Y*fa, e, X, Y
+
+    def lifeL10(self, fa, fr):
+        """
+        Basic rating life L10 (millions of revolutions) for arrays of axial
+        and radial loads.
+        """
+        P = self.equivalentDynamicLoads(fa, fr)[0]
+        with np.errstate(divide="ignore"):
+            return (self.si["Cr"] / P)**life_exponent
+
+    def lifeL10h(self, fa, fr, speed):
+        """
+        Basic rating life L10 in operating hours at rotational speed
+        (quantity, or plain value in rad/s).
+        """
+        speed = strip_units(speed, "angular_velocity")
+        revolutions_per_hour = speed / (2*np.pi) * 3600
+        return self.lifeL10(fa, fr) * 1e6 / revolutions_per_hour
+
+    def dutyCycleLoad(self, fa, fr, weights, speeds=None, axis=-1):
+        """
+        Duty-cycle equivalent dynamic load (N): cube-mean of the load points'
+        equivalent loads along axis, weighted by time fraction (weights) and,
+        if given, by speed (number of revolutions spent at each load).
+        """
+        P = self.equivalentDynamicLoads(fa, fr)[0]
+        weights = np.asarray(weights, dtype=float)
+        if speeds is not None:
+            weights = weights * strip_units(speeds, "angular_velocity")
+        weights = np.broadcast_to(weights, P.shape)
+
+        return (np.sum(weights * P**life_exponent, axis=axis)
+                / np.sum(weights, axis=axis))**(1/life_exponent)
+
     def draw(self):
         """
         Plots bearing "e" and "X,Y" versus axial load.
         """
+        import matplotlib.pyplot as plt
+
         # e vs i*f0*Fa/C0r
         plt.figure(figsize=(4,3))
 
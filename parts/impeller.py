@@ -1,11 +1,36 @@
 """
 """
 
-from .. import ureg
-from .. import display_units
+from .. import strip_units, SIQuantity, g_n
+from .. import cache
 import numpy as np
+import sys
 
 class ImpellerBarske:
+    """
+    Sizing runs on SI magnitudes stored in self.si; the quantity attributes
+    below are built in display units only when accessed (printing, plotting).
+    """
+    h    = SIQuantity("length", "head")
+    q    = SIQuantity("volume_flow", "volume_flow")
+    cm   = SIQuantity("velocity", "velocity")
+    u1   = SIQuantity("velocity", "velocity")
+    u2   = SIQuantity("velocity", "velocity")
+    d0   = SIQuantity("length", "length")
+    dh   = SIQuantity("length", "length")
+    ds   = SIQuantity("length", "length")
+    d1   = SIQuantity("length", "length")
+    d2   = SIQuantity("length", "length")
+    b1   = SIQuantity("length", "length")
+    b2   = SIQuantity("length", "length")
+    t1   = SIQuantity("length", "length")
+    t2   = SIQuantity("length", "length")
+    l    = SIQuantity("length", "length")
+    mass = SIQuantity("mass")
+    com  = SIQuantity("length", "length")
+    ip   = SIQuantity("inertia")
+    id   = SIQuantity("inertia")
+
     def __init__(self, design_point,
                  diameter_inlet, diameter_hub, diameter_shaft,
                  flow_coefficient_suction, blockage_coefficient_suction,
@@ -17,109 +42,121 @@ class ImpellerBarske:
         self.material      = material
         self.through_shaft = through_shaft
 
-        self.d0  = diameter_inlet
-        self.dh  = diameter_hub
-        self.ds  = diameter_shaft
         self.phi = flow_coefficient_suction
         self.psi = head_recovery_coefficient
         self.kb1 = blockage_coefficient_suction
         self.kb2 = blockage_coefficient_discharge
         self.z   = blade_count
-        self.l   = length_hub
+
+        self.si = dict()
+        self.si["d0"] = strip_units(diameter_inlet, "length")
+        self.si["dh"] = strip_units(diameter_hub, "length")
+        self.si["ds"] = strip_units(diameter_shaft, "length")
+        self.si["l"]  = strip_units(length_hub, "length")
+
+        self.size()
+
+    def size(self):
+        """
+        Runs the sizing equations, or loads their results from the
+        persistent cache (see pump_analysis.cache) when it is enabled.
+        """
+        disk_cache = cache.default_cache()
+        if disk_cache is not None:
+            key = cache.stable_hash(type(self).__name__, cache.format_version,
+                                    cache.code_hash(sys.modules[
+                                        type(self).__module__]),
+                                    self.design_point,
+                                    self.material, self.phi, self.psi,
+                                    self.kb1, self.kb2, self.z, self.si,
+                                    self.through_shaft)
+            stored = disk_cache.get(key)
+            if stored is not None:
+                self.si.update({name: value[()]
+                                for name, value in stored.items()})
+                return
+            inputs = set(self.si)
 
         self.compute_head()
         self.compute_volume_flowrate()
         self.compute_dimensions_suction()
         self.compute_dimensions_discharge()
         self.compute_blade_thickness()
-        self.format_units()
         self.compute_mass_and_inertia()
 
+        if disk_cache is not None:
+            disk_cache.put(key, {name: np.asarray(value)
+                                 for name, value in self.si.items()
+                                 if name not in inputs})
+
     def compute_head(self):
         """
         """
-        density = self.design_point.fluid.rho
-        delta_p = self.design_point.dp
-        self.h  = delta_p / (density * ureg("g_n"))
+        self.si["h"] = self.design_point.si["h"]
 
     def compute_volume_flowrate(self):
         """
         """
-        density = self.design_point.fluid.rho
-        mdot    = self.design_point.mdot
-        self.q  = mdot / density
+        self.si["q"] = self.design_point.si["q"]
 
     def compute_dimensions_suction(self):
         """
         """
-        self.cm = self.q / (np.pi/4 * self.d0**2)
+        si = self.si
+        si["cm"] = si["q"] / (np.pi/4 * si["d0"]**2)
         if self.through_shaft:
-            self.cm = self.q / (np.pi/4 * (self.d0**2 - self.ds**2))
-        self.u1 = self.cm / self.phi
-        self.d1 = 2*self.u1 / self.design_point.omega
-        self.b1 = self.q / (np.pi * self.d1 * self.cm * self.kb1)
+            si["cm"] = si["q"] / (np.pi/4 * (si["d0"]**2 - si["ds"]**2))
+        si["u1"] = si["cm"] / self.phi
+        si["d1"] = 2*si["u1"] / self.design_point.si["omega"]
+        si["b1"] = si["q"] / (np.pi * si["d1"] * si["cm"] * self.kb1)
 
     def compute_dimensions_discharge(self):
         """
         """
-        self.u2 = (1. / (1 + self.psi) *
-                   np.sqrt((self.u1**2 + 2 * ureg("g_n") * self.h)))
-        self.d2 = 2*self.u2 / self.design_point.omega
-        self.b2 = self.q / (np.pi * self.d2 * self.cm * self.kb2)
+        si = self.si
+        si["u2"] = (1. / (1 + self.psi) *
+                    np.sqrt((si["u1"]**2 + 2 * g_n * si["h"])))
+        si["d2"] = 2*si["u2"] / self.design_point.si["omega"]
+        si["b2"] = si["q"] / (np.pi * si["d2"] * si["cm"] * self.kb2)
 
     def compute_blade_thickness(self):
         """
         """
-        self.t1 = np.pi * self.d1 * (1 - self.kb1) / self.z
-        self.t2 = np.pi * self.d2 * (1 - self.kb2) / self.z
+        si = self.si
+        si["t1"] = np.pi * si["d1"] * (1 - self.kb1) / self.z
+        si["t2"] = np.pi * si["d2"] * (1 - self.kb2) / self.z
 
     def compute_mass_and_inertia(self):
         """
         """
-        hub_volume   = self.l * (np.pi/4 * (self.dh**2 - self.ds**2))
-        hub_mass     = self.material.rho * hub_volume
-        hub_com_x    = self.l/2
-        blade_volume = (self.b1 + self.b2)/2 * (self.t1 + self.t2)/2 * \
-                       (self.d2 - self.d1)/2 # approximate
-        blade_mass   = self.material.rho * blade_volume
-        blade_com_y  = self.d2/2 + (self.d2/2 - self.d1/2) * (self.b2
-                       + 2*self.b1) / 3 / (self.b1 + self.b2)
-        fact = (blade_com_y - self.d1/2) / (self.d2/2 - self.d1/2)
-        blade_com_x  = - (self.b1 - self.b2) + self.b1/2 * (1 - fact) \
-                       + self.b2/2 * fact
-
-        self.mass = hub_mass + self.z*blade_mass
-        self.com  = (hub_com_x*hub_mass + blade_com_x*blade_mass*self.z) \
-                    / self.mass
-        
-        self.ip = hub_mass/2 * ((self.d2/2)**2 - (self.d1/2)**2)
-        self.ip += self.z * (1/12 * blade_mass * ((self.d2 - self.d1)/2)**2
-                             + blade_mass * blade_com_y**2)
+        si  = self.si
+        rho = self.material.si["rho"]
+        d1, d2, b1, b2 = si["d1"], si["d2"], si["b1"], si["b2"]
 
-        # big approximation (placeholder)
-        self.id = self.ip / 2
+        hub_volume   = si["l"] * (np.pi/4 * (si["dh"]**2 - si["ds"]**2))
+        hub_mass     = rho * hub_volume
+        hub_com_x    = si["l"]/2
+        blade_volume = (b1 + b2)/2 * (si["t1"] + si["t2"])/2 * \
+                       (d2 - d1)/2 # approximate
+        blade_mass   = rho * blade_volume
+        blade_com_y  = d2/2 + (d2/2 - d1/2) * (b2 + 2*b1) / 3 / (b1 + b2)
+        fact = (blade_com_y - d1/2) / (d2/2 - d1/2)
+        blade_com_x  = - (b1 - b2) + b1/2 * (1 - fact) + b2/2 * fact
 
-    def format_units(self):
-        """
-        """
-        self.h.ito(display_units["head"])
-        self.q.ito(display_units["volume_flow"])
-        self.cm.ito(display_units["velocity"])
-        self.u1.ito(display_units["velocity"])
-        self.u2.ito(display_units["velocity"])
-        self.ds.ito(display_units["length"])
-        self.dh.ito(display_units["length"])
-        self.d0.ito(display_units["length"])
-        self.d1.ito(display_units["length"])
-        self.d2.ito(display_units["length"])
-        self.b1.ito(display_units["length"])
-        self.b2.ito(display_units["length"])
-        self.l.ito(display_units["length"])
+        si["mass"] = hub_mass + self.z*blade_mass
+        si["com"]  = (hub_com_x*hub_mass + blade_com_x*blade_mass*self.z) \
+                     / si["mass"]
+
+        si["ip"] = hub_mass/2 * ((d2/2)**2 - (d1/2)**2)
+        si["ip"] = si["ip"] + self.z * (1/12 * blade_mass * ((d2 - d1)/2)**2
+                                        + blade_mass * blade_com_y**2)
+
+        # big approximation (placeholder)
+        si["id"] = si["ip"] / 2
 
     def print(self):
         """
         """
-        self.format_units()
         data =   "Impeller Results\n"
         data +=  "================\n\n"
         data +=  "  Design Point  \n"
@@ -142,3 +179,61 @@ class ImpellerBarske:
         data += f"b2: {self.b2:~.2f}\n"
 
         print(data)
+
+def broadcast(*values):
+    """
+    Broadcasts plain numbers and arrays to a common shape.
+    Returns contiguous float copies.
+    """
+    shape = np.broadcast_shapes(*(np.shape(value) for value in values))
+    return [np.array(np.broadcast_to(value, shape), dtype=float)
+            for value in values]
+
+class ImpellerBarskeBatch(ImpellerBarske):
+    """
+    Vectorized version of ImpellerBarske for design-space sweeps.
+
+    Inputs other than design_point, material and through_shaft may be NumPy
+    arrays (plain numbers or one unit-wrapped array per input). They are
+    broadcast against each other and sized with the same Barske equations as
+    the scalar class, evaluated as whole-array operations.
+    """
+    columns = ("d1", "d2", "b1", "b2", "t1", "t2", "mass", "com", "ip", "id")
+
+    def __init__(self, design_point,
+                 diameter_inlet, diameter_hub, diameter_shaft,
+                 flow_coefficient_suction, blockage_coefficient_suction,
+                 head_recovery_coefficient, blockage_coefficient_discharge,
+                 blade_count, material, length_hub, through_shaft):
+        """
+        """
+        inputs = broadcast(strip_units(diameter_inlet, "length"),
+                           strip_units(diameter_hub, "length"),
+                           strip_units(diameter_shaft, "length"),
+                           strip_units(flow_coefficient_suction,
+                                       "dimensionless"),
+                           strip_units(blockage_coefficient_suction,
+                                       "dimensionless"),
+                           strip_units(head_recovery_coefficient,
+                                       "dimensionless"),
+                           strip_units(blockage_coefficient_discharge,
+                                       "dimensionless"),
+                           blade_count,
+                           strip_units(length_hub, "length"))
+        self.shape = inputs[0].shape
+
+        super().__init__(design_point, *inputs[:8], material, inputs[8],
+                         through_shaft)
+
+    def __len__(self):
+        return int(np.prod(self.shape))
+
+    def table(self, units=True):
+        """
+        Returns sized geometry, mass and inertia as a dict of arrays (one
+        column per entry of ImpellerBarskeBatch.columns). With units=False,
+        columns are plain ndarrays in SI base units.
+        """
+        if units:
+            return {column: getattr(self, column) for column in self.columns}
+        return {column: self.si[column] for column in self.columns}
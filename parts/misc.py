@@ -1,6 +1,38 @@
 """
 """
 
-class ShaftCoupler:
-    def __init__(self):
-        self.a = 0
+from .. import strip_units
+
+class Disk:
+    """
+    Rigid disk mounted on the shaft (inducer, balance drum, sleeve, ...),
+    described by its mass properties. Dimensions, mass and inertias are
+    stored in SI base units in si, under the keys used by the rotor layout
+    (ds, do, l, com, mass, ip, id).
+    """
+    kind = "disk"
+
+    def __init__(self, name, bore_diameter, outer_diameter, length, mass,
+                 polar_inertia, diametral_inertia, center_of_mass=None):
+        """
+        center_of_mass is measured from the disk's reference (left) face and
+        defaults to half the length.
+        """
+        self.name = name
+        self.si = dict()
+        self.si["ds"]   = strip_units(bore_diameter, "length")
+        self.si["do"]   = strip_units(outer_diameter, "length")
+        self.si["l"]    = strip_units(length, "length")
+        self.si["mass"] = strip_units(mass, "mass")
+        self.si["ip"]   = strip_units(polar_inertia, "inertia")
+        self.si["id"]   = strip_units(diametral_inertia, "inertia")
+        if center_of_mass is None:
+            self.si["com"] = self.si["l"] / 2
+        else:
+            self.si["com"] = strip_units(center_of_mass, "length")
+
+class ShaftCoupler(Disk):
+    """
+    Shaft coupling hub, modeled as a rigid disk.
+    """
+    kind = "coupling"
@@ -1,6 +1,21 @@
 """
 """
 
+from .. import strip_units
+
 class ShaftSeal:
-    def __init__(self):
-        self.a = 0
+    """
+    Annular shaft seal. Its rotordynamic coefficients, if any, are given as
+    a BearingCoefficients table (see parts.bearing) and act at the seal
+    center.
+    """
+    def __init__(self, name, bore_diameter, outer_diameter, length,
+                 coefficients=None):
+        """
+        """
+        self.name = name
+        self.coefficients = coefficients
+        self.si = dict()
+        self.si["d"] = strip_units(bore_diameter, "length")
+        self.si["D"] = strip_units(outer_diameter, "length")
+        self.si["l"] = strip_units(length, "length")
@@ -1,31 +1,114 @@
 """
 """
 
-from .. import ureg
+from types import MappingProxyType
+
+import numpy as np
+
+from .. import strip_units
 
 class Shaft:
     """
+    Shaft made of cylindrical segments. Segment start positions, lengths and
+    diameters are stored column-wise (x0, l and d arrays, in SI base units)
+    and grown in place as segments are appended.
     """
     def __init__(self, material, segments=[]):
         """
         """
         self.material = material
-        self.segments = []
+        self.columns = np.zeros((3, max(8, len(segments))))
+        self.n_segments = 0
+        self.rotors = []
 
         for segment in segments:
             self.addSegment(segment["diameter"], segment["length"])
 
+    @property
+    def x0(self):
+        return self.columns[0, :self.n_segments]
+
+    @property
+    def l(self):
+        return self.columns[1, :self.n_segments]
+
+    @property
+    def d(self):
+        return self.columns[2, :self.n_segments]
+
+    @property
+    def length(self):
+        """
+        Total shaft length (m).
+        """
+        if self.n_segments == 0:
+            return 0.0
+        return self.x0[-1] + self.l[-1]
+
     def addSegment(self, diameter, length):
         """
+        Appends a segment. Segment diameter, length and start position are
+        stored in SI base units (m).
         """
-        segment = dict()
-        segment["d"] = diameter
-        segment["l"] = length
-        if len(self.segments) == 0:
-            segment["x0"] = 0 * ureg("m")
-        else:
-            segment["x0"] = sum(segment["l"] for segment in self.segments)
+        if self.n_segments == self.columns.shape[1]:
+            self.columns = np.concatenate((self.columns,
+                                           np.zeros_like(self.columns)),
+                                          axis=1)
 
-        self.segments.append(segment)
+        x0 = self.length
+        i  = self.n_segments
+        self.columns[:, i] = (x0,
+                              strip_units(length, "length"),
+                              strip_units(diameter, "length"))
+        self.n_segments += 1
 
+    def segment(self, i):
+        """
+        Segment i as a read-only mapping with keys "d", "l" and "x0" (m),
+        a snapshot of the columns; use set_segment to change it.
+        """
+        if i < 0 or i >= self.n_segments:
+            raise IndexError("Shaft segment does not exist")
+        return MappingProxyType({"d":  float(self.columns[2, i]),
+                                 "l":  float(self.columns[1, i]),
+                                 "x0": float(self.columns[0, i])})
 
+    @property
+    def segments(self):
+        """
+        All segments as read-only mappings (see segment).
+        """
+        return [self.segment(i) for i in range(self.n_segments)]
+
+    def set_segment(self, i, diameter=None, length=None):
+        """
+        Changes the diameter and/or length of segment i; the start
+        positions of the following segments move with its length, and the
+        components of every Rotor built on this shaft are placed again on
+        their segments. Raises ValueError, leaving the shaft unchanged, if
+        the components on segment i no longer fit (see
+        Rotor.checkSegment).
+        """
+        if i < 0 or i >= self.n_segments:
+            raise IndexError("Shaft segment does not exist")
+        d = self.columns[2, i]
+        l = self.columns[1, i]
+        if diameter is not None:
+            d = strip_units(diameter, "length")
+        if length is not None:
+            l = strip_units(length, "length")
+        for rotor in self.rotors:
+            rotor.checkSegment(i, d, l)
+
+        self.columns[1:, i] = (l, d)
+        self.columns[0, 1:self.n_segments] = \
+            np.cumsum(self.columns[1, :self.n_segments - 1])
+        for rotor in self.rotors:
+            rotor.relocateComponents()
+
+    def locate(self, x):
+        """
+        Index of the segment containing each axial position x (m).
+        """
+        i = np.searchsorted(self.x0, x, side="right") - 1
+        return np.clip(i, 0, self.n_segments - 1)
@@ -1,163 +1,262 @@
 """
+Rotor and impeller drawings.
+
+Rotor drawings are built as arrays of line segments (one LineCollection per
+line style) and rendered on explicit Agg figures, without pyplot state, so
+they can be produced headless and in worker processes (render_rotors).
 """
 
-import matplotlib as mpl
-import matplotlib.pyplot as plt
+import matplotlib.style
 import numpy as np
 import os.path
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
 
-mpl.rcParams["font.family"] = ["sans-serif"]
-mpl.rcParams["font.sans-serif"] = ["IBM Plex Mono"]
+from .. import ureg, unit, display_units, init_worker
 
-plt.style.use("dark_background")
+style = ["dark_background",
+         {"font.family":     ["sans-serif"],
+          "font.sans-serif": ["IBM Plex Mono"]}]
 
-def array(quantity_list, unit):
+def length_scale():
     """
-    Homogenizes units within list of quantities.
-    Returns array of magnitudes expressed in common unit.
+    Returns display length unit and the factor converting meters into it.
     """
-    array_mag = []
-    for quantity in quantity_list:
-        array_mag.append(quantity.to(unit).magnitude)
-
-    return np.array(array_mag)
+    length_unit = display_units["length"]
+    return length_unit, ureg.Quantity(1.0, unit("m")).m_as(length_unit)
 
-def plot_impeller(impeller, outdir):
+def impeller_outline(impeller):
     """
+    Returns impeller meridional outline (x, y) in meters, with x measured
+    from the hub face.
     """
-    impeller.format_units()
-    length_unit = impeller.d2.units
-    length = impeller.l + (impeller.b1 - impeller.b2)
-    width  = impeller.d2
-    aspect_ratio = (length / width).to("dimensionless").magnitude
-    fig_height   = 3
-    plt.figure(figsize=(aspect_ratio*fig_height, fig_height))
-
-    impeller_x = array([0 * length_unit,
-                        0 * length_unit,
-                        -(impeller.b1 - impeller.b2),
-                        0 * length_unit,
-                        impeller.b2,
-                        impeller.b2,
-                        impeller.l,
-                        impeller.l,
-                        0 * length_unit], length_unit)
-
-    impeller_y = array([impeller.ds / 2,
-                        impeller.d1 / 2,
-                        impeller.d1 / 2,
-                        impeller.d2 / 2,
-                        impeller.d2 / 2,
-                        impeller.dh / 2,
-                        impeller.dh / 2,
-                        impeller.ds / 2,
-                        impeller.ds / 2], length_unit)
-
-    plt.plot(impeller_x,  impeller_y, color="palegreen")
-    plt.plot(impeller_x, -impeller_y, color="palegreen")
-
-    plt.axis("equal")
-
-    figpath = os.path.join(outdir, "impeller.png")
-    plt.savefig(figpath, dpi=300, bbox_inches="tight")
-    plt.close("all")
-
-def plot_rotor(rotor, outdir):
+    si = impeller.si
+    impeller_x = np.array([0.0,
+                           0.0,
+                           -(si["b1"] - si["b2"]),
+                           0.0,
+                           si["b2"],
+                           si["b2"],
+                           si["l"],
+                           si["l"],
+                           0.0])
+
+    impeller_y = np.array([si["ds"],
+                           si["d1"],
+                           si["d1"],
+                           si["d2"],
+                           si["d2"],
+                           si["dh"],
+                           si["dh"],
+                           si["ds"],
+                           si["ds"]]) / 2
+
+    return impeller_x, impeller_y
+
+def polyline_segments(x, y):
     """
+    Line segments, (n, 2, 2) array of start and end points, of polylines
+    given point-wise: x and y are (n_points,) for one polyline or
+    (n_points, n_lines) for one polyline per column.
     """
-    rotor.impeller["impeller"].format_units()
-    length_unit = rotor.impeller["impeller"].d2.units
-
-    length = sum(segment["l"] for segment in rotor.shaft.segments)
-    width = max([bearing["model"].D for bearing in rotor.bearings])
-    aspect_ratio = (length / width).to("dimensionless").magnitude * 0.8
-
-    # shaft layout plot
-    fig_height = 3
-    plt.figure(figsize=(aspect_ratio*fig_height, fig_height))
-
-    for segment in rotor.shaft.segments:
-        x1, x2 = segment["x0"], segment["x0"]+segment["l"]
-        y1, y2 = -segment["d"]/2, segment["d"]/2
-
-        segment_x = array([x1, x1, x2, x2, x1], length_unit)
-        segment_y = array([y1, y2, y2, y1, y1], length_unit)
-
-        plt.plot(segment_x, segment_y, color="white")
-
-    for bearing in rotor.bearings:
-        x1, x2 = bearing["x1"], bearing["x2"]
-        y1, y2 = bearing["model"].d/2, bearing["model"].D/2
-
-        bearing_x = array([x1, x1, x2, x2, x1], length_unit)
-        bearing_y = array([y1, y2, y2, y1, y1], length_unit)
-
-        plt.plot(bearing_x,  bearing_y, color="lightskyblue")
-        plt.plot(bearing_x, -bearing_y, color="lightskyblue")
-        
-        cross_x = array([x1, x2, x1, x2], length_unit)
-        cross_y = array([y1, y2, y2, y1], length_unit)
-
-        plt.plot(cross_x,  cross_y, color="lightskyblue")
-        plt.plot(cross_x, -cross_y, color="lightskyblue")
-
-        # plot contact angle lines
-        axial_distance = bearing["model"].D/2 * np.sin(bearing["model"].alpha)
-        end_point      = bearing["xc"] + axial_distance
-
-        if bearing["orientation"] == "right":
-            end_point = bearing["xc"] - axial_distance
-
-        line_x = array([bearing["xc"], end_point], length_unit)
-        line_y = array([0 * length_unit, bearing["model"].D/2], length_unit)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if x.ndim == 1:
+        x, y = x[:, None], y[:, None]
+    points = np.stack((x, y), axis=-1)
+    return np.stack((points[:-1], points[1:]), axis=-2).reshape(-1, 2, 2)
+
+def mirrored(segments):
+    """
+    Segments and their mirror image about the rotor axis.
+    """
+    return np.concatenate((segments, segments * [1.0, -1.0]))
 
-        plt.plot(line_x,  line_y, color="lavender",
-                 linestyle="dashdot", linewidth=1)
-        plt.plot(line_x, -line_y, color="lavender",
-                 linestyle="dashdot", linewidth=1)
+def rotor_layers(rotor):
+    """
+    Rotor drawing as a list of (segments, line style) layers, segments in
+    meters (see polyline_segments) and line style as LineCollection keyword
+    arguments.
+    """
+    shaft  = rotor.shaft
+    layers = []
+
+    # one outline (column) per segment
+    x1, x2 = shaft.x0, shaft.x0 + shaft.l
+    y1, y2 = -shaft.d/2, shaft.d/2
+    layers.append((polyline_segments([x1, x1, x2, x2, x1],
+                                     [y1, y2, y2, y1, y1]),
+                   {"colors": "white"}))
+
+    # bearing boxes, crosses and contact angle lines
+    bearings = rotor.bearings
+    if len(bearings) > 0:
+        si = [bearing["model"].si for bearing in bearings]
+        x1, x2, xc = bearings.x1, bearings.x2, bearings.xc
+        y1    = np.array([model["d"] for model in si]) / 2
+        y2    = np.array([model["D"] for model in si]) / 2
+        alpha = np.array([model["alpha"] for model in si])
+        sign  = np.array([-1.0 if bearing["orientation"] == "right" else 1.0
+                          for bearing in bearings])
+        end_point = xc + sign * y2 * np.sin(alpha)
+
+        boxes   = polyline_segments([x1, x1, x2, x2, x1],
+                                    [y1, y2, y2, y1, y1])
+        crosses = polyline_segments([x1, x2, x1, x2], [y1, y2, y2, y1])
+        lines   = polyline_segments([xc, end_point], [0.0 * y2, y2])
+        layers.append((mirrored(np.concatenate((boxes, crosses))),
+                       {"colors": "lightskyblue"}))
+        layers.append((mirrored(lines),
+                       {"colors": "lavender", "linestyles": "dashdot",
+                        "linewidths": 1.0}))
+
+    # impellers and other disks
+    outlines = {"palegreen": [], "khaki": []}
+    for disk in rotor.disks:
+        if disk["kind"] == "impeller":
+            disk_x, disk_y = impeller_outline(disk["impeller"])
+            color = "palegreen"
+        else:
+            si = disk["part"].si
+            disk_x = np.array([0.0, 0.0, si["l"], si["l"], 0.0])
+            disk_y = np.array([si["ds"], si["do"], si["do"], si["ds"],
+                               si["ds"]]) / 2
+            color = "khaki"
+
+        if disk["orientation"] == "left":
+            disk_x = disk_x + disk["x1"]
+        elif disk["orientation"] == "right":
+            disk_x = disk["x2"] - disk_x
+
+        outlines[color].append(polyline_segments(disk_x, disk_y))
+
+    for color, segments in outlines.items():
+        if segments:
+            layers.append((mirrored(np.concatenate(segments)),
+                           {"colors": color}))
+
+    # seals
+    seals = rotor.seals
+    if len(seals) > 0:
+        x1, x2 = seals.x1, seals.x2
+        y1 = np.array([seal["model"].si["d"] for seal in seals]) / 2
+        y2 = np.array([seal["model"].si["D"] for seal in seals]) / 2
+        layers.append((mirrored(polyline_segments([x1, x1, x2, x2, x1],
+                                                  [y1, y2, y2, y1, y1])),
+                       {"colors": "plum"}))
+
+    layers.append((polyline_segments([0.0, shaft.length], [0.0, 0.0]),
+                   {"colors": "darkgray", "linestyles": "dashdot",
+                    "linewidths": 1.0}))
+
+    return layers
+
+def impeller_layers(impeller):
+    """
+    Impeller drawing layers (see rotor_layers).
+    """
+    impeller_x, impeller_y = impeller_outline(impeller)
+    return [(mirrored(polyline_segments(impeller_x, impeller_y)),
+             {"colors": "palegreen"})]
 
-    # plot impeller
-    impeller_x = array([0 * length_unit,
-                        0 * length_unit,
-                        -(rotor.impeller["impeller"].b1 - rotor.impeller["impeller"].b2),
-                        0 * length_unit,
-                        rotor.impeller["impeller"].b2,
-                        rotor.impeller["impeller"].b2,
-                        rotor.impeller["impeller"].l,
-                        rotor.impeller["impeller"].l,
-                        0 * length_unit], length_unit)
+def impeller_figure_size(impeller, fig_height=3):
+    """
+    Figure size (inches) of an impeller drawing.
+    """
+    length = impeller.si["l"] + (impeller.si["b1"] - impeller.si["b2"])
+    aspect_ratio = length / impeller.si["d2"]
+    return (aspect_ratio*fig_height, fig_height)
 
-    impeller_y = array([rotor.impeller["impeller"].ds / 2,
-                        rotor.impeller["impeller"].d1 / 2,
-                        rotor.impeller["impeller"].d1 / 2,
-                        rotor.impeller["impeller"].d2 / 2,
-                        rotor.impeller["impeller"].d2 / 2,
-                        rotor.impeller["impeller"].dh / 2,
-                        rotor.impeller["impeller"].dh / 2,
-                        rotor.impeller["impeller"].ds / 2,
-                        rotor.impeller["impeller"].ds / 2], length_unit)
+def rotor_figure_size(rotor, fig_height=3):
+    """
+    Figure size (inches) of a rotor drawing.
+    """
+    widths = [bearing["model"].si["D"] for bearing in rotor.bearings]
+    if not widths:
+        widths = [np.max(rotor.shaft.d)]
+    aspect_ratio = rotor.shaft.length / max(widths) * 0.8
+    return (aspect_ratio*fig_height, fig_height)
 
+def render_layers(layers, figsize, target=None, dpi=100):
+    """
+    Renders drawing layers (segments in meters, see rotor_layers) on an Agg
+    figure, in display length units. Writes a PNG to target (path or file
+    object); without target, returns the PNG bytes.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.collections import LineCollection
+    from matplotlib.figure import Figure
 
-    if rotor.impeller["orientation"] == "left":
-        impeller_x = impeller_x + rotor.impeller["x1"].to(length_unit).magnitude
-    elif rotor.impeller["orientation"] == "right":
-        impeller_x = rotor.impeller["x2"].to(length_unit).magnitude - impeller_x
+    length_unit, scale = length_scale()
+    short_unit_string = f"{length_unit:~}"
 
-    plt.plot(impeller_x,  impeller_y, color="palegreen")
-    plt.plot(impeller_x, -impeller_y, color="palegreen")
+    with matplotlib.style.context(style):
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        for segments, line_style in layers:
+            ax.add_collection(LineCollection(segments * scale, **line_style))
+        ax.axis("equal")
+        ax.autoscale_view()
+        ax.set_xlabel(f"axial coordinate ({short_unit_string})")
+        ax.set_ylabel(f"radial coordinate ({short_unit_string})")
+
+        buffer = BytesIO() if target is None else target
+        fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+
+    if target is None:
+        return buffer.getvalue()
+    return target
+
+def render_rotor(rotor, target=None, dpi=100):
+    """
+    Renders a rotor drawing to a PNG file (target path or file object) or,
+    without target, to PNG bytes.
+    """
+    return render_layers(rotor_layers(rotor), rotor_figure_size(rotor),
+                         target, dpi)
 
-    centerline_x = array([0 * length_unit, length], length_unit)
-    centerline_y = array([0 * length_unit, 0 * length_unit], length_unit)
+def render_task(task):
+    """
+    Process pool worker: renders one (layers, figsize, target, dpi) task.
+    """
+    return render_layers(*task)
 
-    plt.plot(centerline_x, centerline_y, color="darkgray",
-             linestyle="dashdot", linewidth=1.0)
+def render_rotors(rotors, outdir=None, dpi=100, max_workers=None,
+                  chunksize=None, prefix="rotor"):
+    """
+    Renders a list of rotors in a process pool. Drawing geometry is built
+    here and only the segment arrays are sent to the workers.
 
-    plt.axis("equal")
+    With outdir, writes prefix_0000.png, prefix_0001.png, ... and returns
+    their paths; otherwise returns the PNG bytes of each drawing.
+    max_workers=1 renders in-process.
+    """
+    tasks = []
+    for i, rotor in enumerate(rotors):
+        target = None
+        if outdir is not None:
+            target = os.path.join(outdir, f"{prefix}_{i:04d}.png")
+        tasks.append((rotor_layers(rotor), rotor_figure_size(rotor), target,
+                      dpi))
+
+    if max_workers == 1:
+        return list(map(render_task, tasks))
+
+    if chunksize is None:
+        workers = max_workers or os.cpu_count() or 1
+        chunksize = max(1, len(tasks) // (4 * workers))
+    with ProcessPoolExecutor(max_workers,
+                             initializer=init_worker) as pool:
+        return list(pool.map(render_task, tasks, chunksize=chunksize))
 
-    short_unit_string = f"{length_unit:~}"
-    plt.xlabel(f"axial coordinate ({short_unit_string})")
-    plt.ylabel(f"radial coordinate ({short_unit_string})")
+def plot_impeller(impeller, outdir):
+    """
+    """
+    render_layers(impeller_layers(impeller), impeller_figure_size(impeller),
+                  os.path.join(outdir, "impeller.png"), dpi=300)
 
-    figpath = os.path.join(outdir, "rotor.png")
-    plt.savefig(figpath, dpi=300, bbox_inches="tight")
-    plt.close("all")
+def plot_rotor(rotor, outdir):
+    """
+    """
+    render_rotor(rotor, os.path.join(outdir, "rotor.png"), dpi=300)
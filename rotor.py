@@ -1,31 +1,118 @@
 """
 """
 
-from .plotting import plot_rotor
-from .analyses.rotordynamics import create_ross_rotor
+import numpy as np
+
+from . import strip_units
+
+class ComponentLayout:
+    """
+    Components of one kind placed on the shaft. Each component is a layout
+    dict (indexed in insertion order), and its segment and x1, x2, xc
+    positions (m) are also kept column-wise, together with the component
+    order by ascending xc, updated on every insertion.
+    """
+    columns = ("segment", "x1", "x2", "xc")
+
+    def __init__(self):
+        """
+        """
+        self.records   = []
+        self.positions = np.zeros((len(self.columns), 8))
+        self.order     = np.zeros(0, dtype=int)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __getitem__(self, i):
+        return self.records[i]
+
+    @property
+    def segment(self):
+        return self.positions[0, :len(self.records)].astype(int)
+
+    @property
+    def x1(self):
+        return self.positions[1, :len(self.records)]
+
+    @property
+    def x2(self):
+        return self.positions[2, :len(self.records)]
+
+    @property
+    def xc(self):
+        return self.positions[3, :len(self.records)]
+
+    def append(self, record):
+        """
+        Adds a layout dict with "segment", "x1", "x2" and "xc" entries.
+        """
+        i = len(self.records)
+        if i == self.positions.shape[1]:
+            self.positions = np.concatenate((self.positions,
+                                             np.zeros_like(self.positions)),
+                                            axis=1)
+        self.positions[:, i] = [record[column] for column in self.columns]
+        self.records.append(record)
+
+        rank = np.searchsorted(self.xc[self.order], record["xc"],
+                               side="right")
+        self.order = np.insert(self.order, rank, i)
+
+    def between(self, x_left, x_right):
+        """
+        Indices of the components with x_left < xc < x_right, by ascending
+        xc. x_left and x_right may be arrays (one range per entry), then a
+        list of index arrays is returned.
+        """
+        xc = self.xc[self.order]
+        lo = np.searchsorted(xc, x_left, side="right")
+        hi = np.searchsorted(xc, x_right, side="left")
+        if np.ndim(lo) == 0:
+            return self.order[lo:hi]
+        return [self.order[i:j] for i, j in zip(lo, hi)]
+
+    def refresh(self):
+        """
+        Reloads the position columns and order from the layout dicts, after
+        their positions changed.
+        """
+        for i, record in enumerate(self.records):
+            self.positions[:, i] = [record[column] for column in self.columns]
+        self.order = np.argsort(self.xc, kind="stable")
 
 class Rotor:
     """
+    Rotor layout: a shaft carrying any number of disks (impellers,
+    inducers, couplings, ...), bearings and seals, each kept in a
+    ComponentLayout. Positions, masses and inertias stored in the layout
+    dicts are plain floats in SI base units.
     """
     def __init__(self, shaft):
         """
         """
         self.shaft = shaft
-        self.impeller = None
-        self.bearings = []
-        self.shaft_seal = None
-        self.shaft_coupling = None
+        shaft.rotors.append(self)
+        self.disks = ComponentLayout()
+        self.bearings = ComponentLayout()
+        self.seals = ComponentLayout()
 
-    def addBearing(self, model, segment_id, side, orientation):
+    def addBearing(self, model, segment_id, side, orientation, axial_load=0.0):
         """
+        axial_load (preload or thrust) selects the bearing coefficients when
+        they are tabulated over axial load.
         """
-        if (segment_id < 0 or segment_id >= len(self.shaft.segments)):
+        if (segment_id < 0 or segment_id >= self.shaft.n_segments):
             raise ValueError("Shaft segment does not exist")
         if side not in ["left", "right"]:
             raise ValueError("Bearing side should be 'left' or 'right'")
         if orientation not in ["left", "right"]:
             raise ValueError("Bearing orientation should be 'left' or 'right'")
-        if model.d != self.shaft.segments[segment_id]["d"]:
+        segment = self.shaft.segment(segment_id)
+        if not np.isclose(model.si["d"], segment["d"]):
             raise ValueError("Mismatch between shaft diameter and " + \
                              "bearing inner diameter.")
 
@@ -34,62 +121,191 @@ class Rotor:
         bearing["side"]        = side
         bearing["orientation"] = orientation
         bearing["model"]       = model
+        bearing["axial_load"]  = strip_units(axial_load, "force")
+        self.placeBearing(bearing)
 
-        offset = 0
+        self.bearings.append(bearing)
+
+    def placeBearing(self, bearing):
+        """
+        Sets the x1, x2 and load center xc positions of a bearing layout
+        dict from its segment, side and orientation.
+        """
+        model   = bearing["model"]
+        segment = self.shaft.segment(bearing["segment"])
+        offset = 0.0
         if bearing["side"] == "right":
-            offset = self.shaft.segments[segment_id]["l"] - model.B
-        bearing["x1"] = self.shaft.segments[segment_id]["x0"] + offset
-        bearing["x2"] = bearing["x1"] + model.B
+            offset = segment["l"] - model.si["B"]
+        bearing["x1"] = segment["x0"] + offset
+        bearing["x2"] = bearing["x1"] + model.si["B"]
 
         # bearing load center
-        bearing["xc"] = bearing["x1"] + model.a
-        if orientation == "left":
-            bearing["xc"] = bearing["x2"] - model.a
+        bearing["xc"] = bearing["x1"] + model.si["a"]
+        if bearing["orientation"] == "left":
+            bearing["xc"] = bearing["x2"] - model.si["a"]
 
-        self.bearings.append(bearing)
-
-    def addImpeller(self, impeller_data, segment_id, side, orientation):
+    def addDisk(self, part, segment_id, side, orientation, kind=None):
         """
+        Mounts a rigid disk (impeller, inducer, coupling, ...) at the left or
+        right end of a shaft segment. part provides its bore diameter, length,
+        center of mass (from the face given by orientation) and mass
+        properties in part.si (keys ds, l, com, mass, ip, id). Disks are kept
+        sorted by axial position of their center of mass.
         """
-        if (segment_id < 0 or segment_id >= len(self.shaft.segments)):
+        if kind is None:
+            kind = getattr(part, "kind", "disk")
+        name = kind.capitalize()
+        if (segment_id < 0 or segment_id >= self.shaft.n_segments):
             raise ValueError("Shaft segment does not exist")
         if side not in ["left", "right"]:
-            raise ValueError("Impeller side should be 'left' or 'right'")
+            raise ValueError(name + " side should be 'left' or 'right'")
         if orientation not in ["left", "right"]:
-            raise ValueError("Impeller orientation should be 'left' or 'right'")
-        if impeller_data.ds != self.shaft.segments[segment_id]["d"]:
+            raise ValueError(name + " orientation should be 'left' or 'right'")
+        segment = self.shaft.segment(segment_id)
+        if not np.isclose(part.si["ds"], segment["d"]):
             raise ValueError("Mismatch between shaft diameter and " + \
-                             "impeller bore diameter.")
-
-        impeller = dict()
-        impeller["segment"]     = segment_id
-        impeller["side"]        = side
-        impeller["orientation"] = orientation
-        impeller["impeller"]    = impeller_data
-
-        offset = 0
-        if impeller["side"] == "right":
-            offset = self.shaft.segments[segment_id]["l"] - impeller_data.l
-        impeller["x1"] = self.shaft.segments[segment_id]["x0"] + offset
-        impeller["x2"] = impeller["x1"] + impeller_data.l
-
-        # impeller center of mass
-        impeller["xc"] = impeller["x1"] + impeller_data.com
-        if orientation == "right":
-            impeller["xc"] = impeller["x2"] - impeller_data.com
-        
-        impeller["mass"] = impeller_data.mass
-        impeller["polar_inertia"] = impeller_data.ip
-        impeller["diametral_inertia"] = impeller_data.id
-
-        self.impeller = impeller
+                             kind + " bore diameter.")
+
+        disk = dict()
+        disk["segment"]     = segment_id
+        disk["side"]        = side
+        disk["orientation"] = orientation
+        disk["kind"]        = kind
+        disk["part"]        = part
+        if kind == "impeller":
+            disk["impeller"] = part
+        self.placeDisk(disk)
+
+        disk["mass"] = part.si["mass"]
+        disk["polar_inertia"] = part.si["ip"]
+        disk["diametral_inertia"] = part.si["id"]
+
+        self.disks.append(disk)
+
+    def placeDisk(self, disk):
+        """
+        Sets the x1, x2 and center of mass xc positions of a disk layout
+        dict from its segment, side and orientation.
+        """
+        part    = disk["part"]
+        segment = self.shaft.segment(disk["segment"])
+        offset = 0.0
+        if disk["side"] == "right":
+            offset = segment["l"] - part.si["l"]
+        disk["x1"] = segment["x0"] + offset
+        disk["x2"] = disk["x1"] + part.si["l"]
+
+        # disk center of mass
+        disk["xc"] = disk["x1"] + part.si["com"]
+        if disk["orientation"] == "right":
+            disk["xc"] = disk["x2"] - part.si["com"]
+
+    def addImpeller(self, impeller_data, segment_id, side, orientation):
+        """
+        """
+        self.addDisk(impeller_data, segment_id, side, orientation,
+                     kind="impeller")
+
+    @property
+    def impellers(self):
+        """
+        Impeller layout dicts, in the order they were added.
+        """
+        return [disk for disk in self.disks if disk["kind"] == "impeller"]
+
+    @property
+    def impeller(self):
+        """
+        Layout dict of the first impeller (None without impeller).
+        """
+        for disk in self.disks:
+            if disk["kind"] == "impeller":
+                return disk
+        return None
+
+    def addSeal(self, seal, segment_id, side):
+        """
+        Places a shaft seal (parts.seal.ShaftSeal) at the left or right end
+        of a shaft segment. Its coefficients act at the seal center.
+        """
+        if (segment_id < 0 or segment_id >= self.shaft.n_segments):
+            raise ValueError("Shaft segment does not exist")
+        if side not in ["left", "right"]:
+            raise ValueError("Seal side should be 'left' or 'right'")
+        segment = self.shaft.segment(segment_id)
+        if seal.si["d"] < segment["d"]:
+            raise ValueError("Seal bore diameter is smaller than shaft " + \
+                             "diameter.")
+
+        layout = dict()
+        layout["segment"] = segment_id
+        layout["side"]    = side
+        layout["model"]   = seal
+        self.placeSeal(layout)
+
+        self.seals.append(layout)
+
+    def placeSeal(self, layout):
+        """
+        Sets the x1, x2 and center xc positions of a seal layout dict from
+        its segment and side.
+        """
+        seal    = layout["model"]
+        segment = self.shaft.segment(layout["segment"])
+        offset = 0.0
+        if layout["side"] == "right":
+            offset = segment["l"] - seal.si["l"]
+        layout["x1"] = segment["x0"] + offset
+        layout["x2"] = layout["x1"] + seal.si["l"]
+        layout["xc"] = (layout["x1"] + layout["x2"]) / 2
+
+    def checkSegment(self, segment_id, diameter, length):
+        """
+        Raises ValueError if the components on shaft segment segment_id
+        would not fit a segment of diameter and length (m): the same bore
+        checks as when they were added, and no component longer than the
+        segment.
+        """
+        on_segment = lambda layouts: [layout for layout in layouts
+                                      if layout["segment"] == segment_id]
+        for bearing in on_segment(self.bearings):
+            if not np.isclose(bearing["model"].si["d"], diameter):
+                raise ValueError("Mismatch between shaft diameter and " + \
+                                 "bearing inner diameter.")
+        for disk in on_segment(self.disks):
+            if not np.isclose(disk["part"].si["ds"], diameter):
+                raise ValueError("Mismatch between shaft diameter and " + \
+                                 disk["kind"] + " bore diameter.")
+        for seal in on_segment(self.seals):
+            if seal["model"].si["d"] < diameter:
+                raise ValueError("Seal bore diameter is smaller than shaft " + \
+                                 "diameter.")
+        for layout in on_segment(self.bearings) + on_segment(self.disks) + \
+                      on_segment(self.seals):
+            if layout["x2"] - layout["x1"] > length:
+                raise ValueError("Shaft segment is shorter than its " + \
+                                 "components.")
+
+    def relocateComponents(self):
+        """
+        Places every bearing, disk and seal again on its segment, after the
+        shaft segments changed (see Shaft.set_segment).
+        """
+        for layouts, place in ((self.bearings, self.placeBearing),
+                               (self.disks, self.placeDisk),
+                               (self.seals, self.placeSeal)):
+            for layout in layouts:
+                place(layout)
+            layouts.refresh()
 
     def plotRotor(self, outdir="."):
         """
         """
+        from .plotting import plot_rotor
         plot_rotor(self, outdir)
 
     def rossRotor(self, element_dx):
         """
         """
+        from .analyses.rotordynamics import create_ross_rotor
         return create_ross_rotor(self, element_dx)
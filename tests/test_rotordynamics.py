@@ -0,0 +1,20 @@
+"""
+Critical speed sweeps on the overhung example.
+"""
+
+import numpy as np
+
+from ..analyses.rotordynamics import critical_speed_sweep
+from ..examples import overhung
+
+def test_modes_are_tracked_past_a_new_low_root():
+    # a low-frequency root appears at 24000 rad/s on the reduced model
+    table = critical_speed_sweep([overhung.rotor],
+                                 np.linspace(0.0, 60000.0, 61), 2e-3,
+                                 n_modes=4, n_internal_modes=8,
+                                 max_workers=1)
+    wd = table["wd"][0]
+    assert np.all(np.abs(np.diff(wd, axis=0)) < 0.1 * wd[1:])
+    np.testing.assert_allclose(np.sort(table["critical_speeds"][0]),
+                               [9887.3, 13963.5, 29797.3, 41337.9],
+                               rtol=1e-4)
@@ -0,0 +1,23 @@
+"""
+Tolerance propagation on the multistage example, whose stages share one
+ImpellerBarske part.
+"""
+
+import numpy as np
+
+from ..analyses.mesh import discretize_rotor, rotor_model_data
+from ..analyses.uncertainty import impeller_disk_indices, sample_model_data
+from ..examples import multistage
+
+def test_stages_get_their_own_impeller_samples():
+    rotor = multistage.rotor
+    mesh  = discretize_rotor(rotor, 0.01)
+    impeller_disks = impeller_disk_indices(rotor, mesh)
+    assert sorted(k for _, k in impeller_disks) == \
+           list(range(multistage.stage_count))
+
+    data = rotor_model_data(rotor, mesh)
+    mass = np.arange(1.0, multistage.stage_count + 1)
+    sample = sample_model_data(data, {}, 0, impeller_disks, mass, mass, mass)
+    assert sorted(sample["disks"][j]["m"] for j, _ in impeller_disks) == \
+           list(mass)